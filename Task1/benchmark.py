@@ -0,0 +1,153 @@
+import json
+import platform
+import time
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from main import (
+    LOGS_PATH, OUTPUT_DIR, count_codes, create_directory, display_finish, extract_data,
+    filter_logs, get_filename, get_popular_sites
+)
+from module.LogsGenerator import LogsGenerator
+
+"""
+    How to run:
+        Benchmark stages:   python benchmark.py -r 10000 100000 1000000 10000000
+        Benchmark with 8 processes for grouping:    python benchmark.py -r 1000000 -w 8
+        Generate logs.csv for main.py:  python benchmark.py -gr 1000000
+"""
+
+# VAR ------------------------------------------------------------------------ #
+JSON: str = ".json"
+BENCHMARK: str = "benchmark"
+
+
+# MAIN ----------------------------------------------------------------------- #
+def main() -> None:
+    args = prepare_args()
+    create_directory(OUTPUT_DIR)
+    logs_generator = LogsGenerator(
+        args.hosts, args.pages, args.zipf_exponent, args.static_ratio,
+        args.session_end_probability, args.seed
+    )
+
+    if args.generate_rows is not None:
+        print("Generating logs ...")
+        logs_generator.generate(args.generate_rows).to_csv(LOGS_PATH, index=False)
+
+    if args.rows is not None:
+        results: List[Dict[str, Any]] = []
+        for rows_number in args.rows:
+            print("Benchmarking " + str(rows_number) + " rows ...")
+            results += benchmark_stages(logs_generator.generate(rows_number), args.workers)
+
+        filepath = OUTPUT_DIR + get_filename(BENCHMARK, JSON)
+        print("Saving results to " + filepath + " ...")
+        with open(filepath, "w") as file:
+            json.dump(
+                {"environment": prepare_environment(args), "results": results}, file, indent=2
+            )
+
+    display_finish()
+
+
+# DEF ------------------------------------------------------------------------ #
+def benchmark_stages(df: pd.DataFrame, workers: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+
+    filtered_df, result = measure("filter_logs", len(df.index), lambda: filter_logs(df))
+    results.append(result)
+
+    _, result = measure(
+        "get_popular_sites", len(filtered_df.index), lambda: count_popular_sites(filtered_df)
+    )
+    results.append(result)
+
+    _, result = measure(
+        "extract_data", len(filtered_df.index), lambda: extract_data(filtered_df, workers)
+    )
+    results.append(result)
+
+    for result in results:
+        print(
+            result["stage"] + ": " + str(round(result["seconds"], 3)) + " s, "
+            + str(round(result["peak_memory_mb"], 1)) + " MB"
+        )
+
+    return results
+
+
+def count_popular_sites(df: pd.DataFrame) -> pd.DataFrame:
+    url_codes, url_values = pd.factorize(df["url"])
+    return get_popular_sites(url_values, count_codes(url_codes, url_values))
+
+
+def measure(stage: str, rows_number: int, function: Callable[[], Any]) -> Tuple[Any, Dict]:
+    """Peak memory is measured with tracemalloc, which also tracks numpy allocations"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "stage": stage,
+        "rows_number": rows_number,
+        "seconds": seconds,
+        "rows_per_second": rows_number / seconds if seconds > 0 else None,
+        "peak_memory_mb": peak / 1024 / 1024
+    }
+
+
+def prepare_environment(args: Namespace) -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "arguments": vars(args)
+    }
+
+
+def prepare_args() -> Namespace:
+    arg_parser = ArgumentParser()
+
+    arg_parser.add_argument(
+        "-r", "--rows", type=int, nargs="+", help="Numbers of generated rows to benchmark"
+    )
+    arg_parser.add_argument(
+        "-gr", "--generate_rows", type=int,
+        help=f"Generate given number of rows and save them to {LOGS_PATH}"
+    )
+    arg_parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="Number of processes used for grouping"
+    )
+    arg_parser.add_argument(
+        "--hosts", type=int, default=10000, help="Number of hosts"
+    )
+    arg_parser.add_argument(
+        "--pages", type=int, default=2000, help="Number of pages"
+    )
+    arg_parser.add_argument(
+        "--zipf_exponent", type=float, default=1.1, help="Skew of pages popularity"
+    )
+    arg_parser.add_argument(
+        "--static_ratio", type=float, default=0.4, help="Part of requests for images"
+    )
+    arg_parser.add_argument(
+        "--session_end_probability", type=float, default=0.1,
+        help="Probability that gap after request is longer than session"
+    )
+    arg_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of random generator"
+    )
+
+    return arg_parser.parse_args()
+
+
+# __MAIN__ ------------------------------------------------------------------- #
+if __name__ == "__main__":
+    main()
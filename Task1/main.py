@@ -1,19 +1,33 @@
+import io
 import os
 import subprocess
 import sys
 from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import arff
+import numpy as np
 import pandas as pd
 from nameof import nameof
-from tqdm import tqdm
+from scipy.sparse import csr_matrix
+
+from module.ColumnarReader import ColumnarReader
+from module.ColumnarWriter import ColumnarWriter
+from module.DatasetWriter import DatasetWriter
+from module.UrlCounter import UrlCounter
+from module.utils import encode_values
 
 """
     How to run:
         Filter data:    python main.py -f
+        Filter data and export it to csv and arff:  python main.py -f -e
+        Filter data in chunks without rows limit:   python main.py -f -c 100000 -a
+        Filter data and approximately count urls:   python main.py -f -c 100000 -uc 1000
         Group data:     python main.py -g
+        Group data using 8 processes:   python main.py -g -w 8
+        Group data for many session timeouts:   python main.py -g -st 300 600 1800
+        Filter and group only logs appended since previous run:   python main.py -i
 """
 
 # VAR ------------------------------------------------------------------------ #
@@ -21,12 +35,18 @@ DATA_DIR: str = "data/"
 LOGS_PATH: str = DATA_DIR + "logs.csv"
 OUTPUT_DIR: str = "output/"
 FILTERED_LOGS: str = "filtered_logs"
+URL_COUNTS: str = "_url_counts.npz"
 CSV: str = ".csv"
 ARFF: str = ".arff"
+COLUMNAR: str = ".columnar/"
+GROUPING_COLUMNS: List[str] = ["host", "time", "url"]
 SECONDS_IN_MINUTE: int = 60
 FIXED_SESSION_DURATION: int = 10 * SECONDS_IN_MINUTE
 POPULAR_SITE_PERCENT: float = 0.5
 ROWS_NUMBER_TO_READ: int = 200000
+CHUNK_SIZE: int = 100000
+SESSIONS_STATE_PATH: str = DATA_DIR + "sessions_state.npz"
+INCREMENTAL_BLOCK_SIZE: int = 64 * 1024 * 1024
 
 
 # MAIN ----------------------------------------------------------------------- #
@@ -35,35 +55,50 @@ def main() -> None:
     create_directory(OUTPUT_DIR)
     is_filtering_active = args.filter
     is_grouping_active = args.group
-
-    if is_filtering_active:
+    chunk_size = args.chunk_size
+    rows_number = None if args.all_rows else ROWS_NUMBER_TO_READ
+    is_export_active = args.export
+    url_counter = UrlCounter(args.url_counters)
+
+    if is_filtering_active and chunk_size is not None:
+        print("Preparing logs and saving processed data to files in chunks ...")
+        records_number = filter_logs_in_chunks(
+            LOGS_PATH, rows_number, chunk_size, FILTERED_LOGS, DATA_DIR,
+            is_export_active, url_counter, add_date=False
+        )
+        print("Number of saved records: " + str(records_number))
+    elif is_filtering_active:
         print("Preparing logs ...")
-        df: pd.DataFrame = filter_logs(pd.read_csv(LOGS_PATH, nrows=ROWS_NUMBER_TO_READ))
+        df: pd.DataFrame = filter_logs(pd.read_csv(LOGS_PATH, nrows=rows_number))
+        url_counter.update(df["url"])
 
         print("Saving processed data to files, number of records: " + str(len(df.index)) + " ...")
-        save_df_to_csv_and_arff(df, FILTERED_LOGS, DATA_DIR, add_date=False)
+        save_df_to_columnar(df, FILTERED_LOGS, DATA_DIR)
+        if is_export_active:
+            save_df_to_csv_and_arff(df, FILTERED_LOGS, DATA_DIR, add_date=False)
+
+    if is_filtering_active:
+        print("Maximal error of urls counts: " + str(url_counter.error_bound))
+        url_counter.save(DATA_DIR + FILTERED_LOGS + URL_COUNTS)
 
     if is_grouping_active:
         print("Preparing sessions and users ...")
-        df: pd.DataFrame = pd.read_csv(DATA_DIR + FILTERED_LOGS + CSV)
-        (
-            extracted_users, extracted_sessions, extracted_user_pages,
-            extracted_sessions_pages, extracted_sessions_numeric
-        ) = extract_data(df)
-
-        print("Saving processed data to files ...")
-        zipped_data = zip(
-            [
-                extracted_users, extracted_sessions, extracted_user_pages,
-                extracted_sessions_pages, extracted_sessions_numeric
-            ],
-            [
-                nameof(extracted_users), nameof(extracted_sessions), nameof(extracted_user_pages),
-                nameof(extracted_sessions_pages), nameof(extracted_sessions_numeric)
-            ]
-        )
-        for data_frame, label in zipped_data:
-            save_df_to_csv_and_arff(data_frame, label, OUTPUT_DIR)
+        df: pd.DataFrame = load_filtered_logs(FILTERED_LOGS, DATA_DIR)
+        popular_urls: Optional[pd.Index] = load_popular_urls(DATA_DIR + FILTERED_LOGS + URL_COUNTS)
+        if args.session_timeouts is not None:
+            results = extract_data_for_session_timeouts(
+                df, args.session_timeouts, args.workers, popular_urls
+            )
+            for session_timeout, extracted_data in zip(args.session_timeouts, results):
+                save_extracted_data(*extracted_data, label_suffix="_" + str(session_timeout))
+        else:
+            save_extracted_data(*extract_data(df, args.workers, popular_urls))
+
+    if args.incremental:
+        print("Preparing sessions and users from new logs ...")
+        save_extracted_data(*filter_and_extract_incrementally(
+            LOGS_PATH, SESSIONS_STATE_PATH, chunk_size if chunk_size is not None else CHUNK_SIZE
+        ))
 
     display_finish()
 
@@ -77,104 +112,444 @@ def filter_logs(df: pd.DataFrame) -> pd.DataFrame:
         ]
 
 
-def extract_data(df: pd.DataFrame) -> \
+def filter_logs_in_chunks(logs_path: str, rows_number: Optional[int], chunk_size: int,
+                          collection_name: str, output_dir: str, export: bool,
+                          url_counter: UrlCounter, add_date: bool = True) -> int:
+    records_number: int = 0
+    columnar_writer = ColumnarWriter(output_dir + collection_name + COLUMNAR, GROUPING_COLUMNS)
+    dataset_writer: Optional[DatasetWriter] = None
+    if export:
+        dataset_writer = DatasetWriter(
+            output_dir + get_filename(collection_name, CSV, add_date),
+            output_dir + get_filename(collection_name, ARFF, add_date), collection_name
+        )
+
+    for chunk in pd.read_csv(logs_path, nrows=rows_number, chunksize=chunk_size):
+        df: pd.DataFrame = filter_logs(chunk)
+        columnar_writer.write(df)
+        url_counter.update(df["url"])
+        if dataset_writer is not None:
+            dataset_writer.write(df)
+        records_number += len(df.index)
+
+    columnar_writer.close()
+    if dataset_writer is not None:
+        dataset_writer.close()
+
+    return records_number
+
+
+def load_filtered_logs(collection_name: str, input_dir: str) -> pd.DataFrame:
+    if os.path.exists(input_dir + collection_name + COLUMNAR):
+        return ColumnarReader(input_dir + collection_name + COLUMNAR).read(GROUPING_COLUMNS)
+    return pd.read_csv(input_dir + collection_name + CSV, usecols=GROUPING_COLUMNS)
+
+
+def extract_data(df: pd.DataFrame, workers: int = 1,
+                 popular_urls: Optional[pd.Index] = None) -> \
         Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    extracted_sessions: List[Dict[str, Any]] = []
-    extracted_users: List[Dict[str, Any]] = []
-
-    unique_users: pd.Series = df["host"].unique()
-    popular_sites: pd.DataFrame = get_popular_sites(df)
-
-    for user in tqdm(unique_users):
-        requests: pd.DataFrame = df[df["host"] == user]
-
-        session_start = int(requests.iloc[0]["time"])
-        session_end = session_start
-        session_visited_sites: Dict[str, bool] = prepare_popular_sites_with_flag(popular_sites)
-        user_visited_sites: Dict[str, bool] = prepare_popular_sites_with_flag(popular_sites)
-        session_requests_count: int = 0
-        user_requests_count: int = 0
-
-        for index, request in requests.iterrows():
-            if request["time"] - session_end > FIXED_SESSION_DURATION:
-                if session_requests_count > 1:
-                    session_duration = (session_end - session_start)
-                    average_request_duration = session_duration / (session_requests_count - 1)
-                    extracted_sessions.append(
-                        {**{
-                            "duration": session_duration,
-                            "requests_count": session_requests_count,
-                            "average_request_duration": average_request_duration
-                        },
-                         **session_visited_sites}
-                    )
-
-                session_start = request["time"]
-                session_visited_sites = prepare_popular_sites_with_flag(popular_sites)
-                session_requests_count = 0
-
-            if request["url"] in session_visited_sites:
-                session_visited_sites[request["url"]] = True
-                user_visited_sites[request["url"]] = True
-
-            session_requests_count += 1
-            user_requests_count += 1
-            session_end = request["time"]
-
-        extracted_users.append(
-            {**{
-                "requests_count": user_requests_count
-            },
-             **session_visited_sites}
+    return extract_data_for_session_timeouts(
+        df, [FIXED_SESSION_DURATION], workers, popular_urls
+    )[0]
+
+
+def extract_data_for_session_timeouts(df: pd.DataFrame, session_timeouts: List[int],
+                                      workers: int = 1,
+                                      popular_urls: Optional[pd.Index] = None) -> \
+        List[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+    """Popular urls are calculated from df when they are not given"""
+    host_codes, _ = pd.factorize(df["host"])
+    times: np.ndarray = df["time"].to_numpy()
+    url_codes, url_values = pd.factorize(df["url"])
+
+    if popular_urls is None:
+        popular_urls = pd.Index(
+            get_popular_sites(url_values, count_codes(url_codes, url_values))["url"]
+        )
+    # -1 at the end maps missing urls (code -1) to not popular page
+    page_codes: np.ndarray = np.r_[popular_urls.get_indexer(url_values), -1][url_codes]
+
+    if workers > 1:
+        partitions: np.ndarray = (
+                pd.util.hash_pandas_object(df["host"], index=False).to_numpy() % workers
+        )
+        partitions_masks = [partitions == partition for partition in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partitions_results = list(executor.map(
+                extract_users_and_sessions,
+                [host_codes[mask] for mask in partitions_masks],
+                [times[mask] for mask in partitions_masks],
+                [page_codes[mask] for mask in partitions_masks],
+                [popular_urls] * workers,
+                [session_timeouts] * workers
+            ))
+        results = [
+            (
+                pd.concat([
+                    partition_results[index][0] for partition_results in partitions_results
+                ]).sort_index(kind="stable"),
+                pd.concat([
+                    partition_results[index][1] for partition_results in partitions_results
+                ]).sort_index(kind="stable")
+            )
+            for index in range(len(session_timeouts))
+        ]
+    else:
+        results = extract_users_and_sessions(
+            host_codes, times, page_codes, popular_urls, session_timeouts
         )
 
-    return modify_extracted_data(pd.DataFrame(extracted_users), pd.DataFrame(extracted_sessions))
+    return [
+        modify_extracted_data(
+            extracted_users.reset_index(drop=True), extracted_sessions.reset_index(drop=True)
+        )
+        for extracted_users, extracted_sessions in results
+    ]
+
+
+def extract_users_and_sessions(host_codes: np.ndarray, times: np.ndarray, page_codes: np.ndarray,
+                               popular_urls: pd.Index, session_timeouts: List[int]) -> \
+        List[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Requests are sorted and time gaps are calculated once for all session timeouts.
+    Returned frames are indexed with host codes, so partial results can be merged
+    """
+    order: np.ndarray = np.lexsort((times, host_codes))
+    host_codes = host_codes[order]
+    times = times[order]
+    page_codes = page_codes[order]
+    is_host_start, gaps = get_host_starts_and_gaps(host_codes, times)
+
+    host_starts: np.ndarray = np.flatnonzero(is_host_start)
+    users_host_codes: np.ndarray = host_codes[host_starts]
+    users_requests_count: np.ndarray = np.diff(np.r_[host_starts, len(host_codes)])
+
+    results: List[Tuple[pd.DataFrame, pd.DataFrame]] = []
+    for session_timeout in session_timeouts:
+        session_ids: np.ndarray = assign_session_ids(is_host_start, gaps, session_timeout)
+        session_starts, session_ends, is_host_last_session = get_sessions_bounds(
+            session_ids, is_host_start
+        )
+        visited = prepare_visited_pages(
+            session_ids, page_codes, len(session_starts), len(popular_urls)
+        )
 
+        session_requests_count: np.ndarray = session_ends - session_starts + 1
+        closed_sessions: np.ndarray = ~is_host_last_session & (session_requests_count > 1)
+        extracted_sessions = prepare_sessions_frame(
+            host_codes[session_starts[closed_sessions]],
+            times[session_ends[closed_sessions]] - times[session_starts[closed_sessions]],
+            session_requests_count[closed_sessions], visited[closed_sessions], popular_urls
+        )
+        extracted_users = prepare_users_frame(
+            users_host_codes, users_requests_count, visited[is_host_last_session], popular_urls
+        )
+        results.append((extracted_users, extracted_sessions))
 
-def modify_extracted_data(extracted_users: pd.DataFrame, extracted_sessions: pd.DataFrame) -> \
+    return results
+
+
+def get_host_starts_and_gaps(host_codes: np.ndarray,
+                             times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Requests have to be sorted by host and time"""
+    is_host_start: np.ndarray = np.diff(host_codes, prepend=-1) != 0
+    gaps: np.ndarray = np.diff(times, prepend=times[:1])
+    return is_host_start, gaps
+
+
+def assign_session_ids(is_host_start: np.ndarray, gaps: np.ndarray,
+                       session_timeout: int = FIXED_SESSION_DURATION) -> np.ndarray:
+    return np.cumsum(is_host_start | (gaps > session_timeout)) - 1
+
+
+def get_sessions_bounds(session_ids: np.ndarray, is_host_start: np.ndarray) -> \
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    session_starts: np.ndarray = np.flatnonzero(np.diff(session_ids, prepend=-1) != 0)
+    session_ends: np.ndarray = np.flatnonzero(np.diff(session_ids, append=-1) != 0)
+    # Last session of every host is never closed, user flags come from that session
+    is_host_last_session: np.ndarray = np.r_[is_host_start, True][session_ends + 1]
+    return session_starts, session_ends, is_host_last_session
+
+
+def prepare_visited_pages(row_ids: np.ndarray, page_codes: np.ndarray,
+                          rows_number: int, pages_number: int) -> csr_matrix:
+    is_popular: np.ndarray = page_codes >= 0
+    return csr_matrix(
+        (
+            np.ones(np.count_nonzero(is_popular), dtype=bool),
+            (row_ids[is_popular], page_codes[is_popular])
+        ),
+        shape=(rows_number, pages_number)
+    )
+
+
+def prepare_sessions_frame(host_codes: np.ndarray, duration: np.ndarray,
+                           requests_count: np.ndarray, visited: csr_matrix,
+                           popular_urls: pd.Index) -> pd.DataFrame:
+    index = pd.Index(host_codes)
+    return pd.concat([
+        pd.DataFrame({
+            "duration": duration,
+            "requests_count": requests_count,
+            "average_request_duration": duration / (requests_count - 1)
+        }, index=index),
+        pd.DataFrame.sparse.from_spmatrix(visited, index=index, columns=popular_urls)
+    ], axis=1)
+
+
+def prepare_users_frame(host_codes: np.ndarray, requests_count: np.ndarray,
+                        visited: csr_matrix, popular_urls: pd.Index) -> pd.DataFrame:
+    index = pd.Index(host_codes)
+    return pd.concat([
+        pd.DataFrame({"requests_count": requests_count}, index=index),
+        pd.DataFrame.sparse.from_spmatrix(visited, index=index, columns=popular_urls)
+    ], axis=1)
+
+
+def filter_and_extract_incrementally(logs_path: str, state_path: str, chunk_size: int) -> \
         Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    session_additional_cols: List[str] = ["duration", "requests_count", "average_request_duration"]
+    """
+    Only rows appended to logs since previous run are read, logs have to be appended
+    chronologically. Open sessions of hosts and counts of pages are kept in state file,
+    so results are the same as after filtering and grouping all logs at once.
+    Logs are read in blocks cut at last new line, so line which is still being written
+    is left for next run and offset always points at beginning of line.
+    """
+    state: Dict[str, Any] = load_sessions_state(state_path)
+
+    with open(logs_path, "rb") as file:
+        file.seek(state["offset"])
+        if state["offset"] == 0:
+            header = file.readline()
+            if header.endswith(b"\n"):
+                state["columns"] = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+                state["offset"] = len(header)
+
+        remainder = b""
+        if state["offset"] > 0:
+            for block in iter(lambda: file.read(INCREMENTAL_BLOCK_SIZE), b""):
+                data = remainder + block
+                lines_end = data.rfind(b"\n") + 1
+                remainder = data[lines_end:]
+                if lines_end == 0:
+                    continue
+
+                for chunk in pd.read_csv(
+                        io.BytesIO(data[:lines_end]), header=None, names=state["columns"],
+                        chunksize=chunk_size
+                ):
+                    update_sessions_state(state, filter_logs(chunk))
+                state["offset"] += lines_end
+
+    save_sessions_state(state, state_path)
+    return extract_data_from_sessions_state(state)
+
+
+def load_sessions_state(state_path: str) -> Dict[str, Any]:
+    if not os.path.exists(state_path):
+        empty: np.ndarray = np.empty(0, dtype=np.int64)
+        return {
+            "offset": 0, "columns": [], "hosts": {}, "urls": {},
+            "url_counts": empty, "host_requests_count": empty,
+            "open_hosts": empty, "open_times": empty, "open_urls": empty,
+            "closed_hosts": empty, "closed_duration": empty, "closed_requests_count": empty,
+            "closed_pairs_sessions": empty, "closed_pairs_urls": empty
+        }
+
+    with np.load(state_path) as arrays:
+        state: Dict[str, Any] = {name: arrays[name] for name in arrays.files}
+    state["offset"] = int(state["offset"])
+    state["columns"] = state["columns"].tolist()
+    for name in ["hosts", "urls"]:
+        state[name] = {value: code for code, value in enumerate(state[name].tolist())}
+
+    return state
+
+
+def save_sessions_state(state: Dict[str, Any], state_path: str) -> None:
+    np.savez(
+        state_path, **{
+            **state,
+            "offset": np.array(state["offset"]),
+            "columns": np.array(state["columns"], dtype=str),
+            "hosts": np.array(list(state["hosts"]), dtype=str),
+            "urls": np.array(list(state["urls"]), dtype=str)
+        }
+    )
+
+
+def update_sessions_state(state: Dict[str, Any], df: pd.DataFrame) -> None:
+    new_host_codes: np.ndarray = encode_values(state["hosts"], df["host"])
+    new_url_codes: np.ndarray = encode_values(state["urls"], df["url"])
+    state["url_counts"] = np.r_[
+        state["url_counts"], np.zeros(len(state["urls"]) - len(state["url_counts"]), np.int64)
+    ] + count_codes(new_url_codes, state["urls"])
+    state["host_requests_count"] = np.r_[
+        state["host_requests_count"],
+        np.zeros(len(state["hosts"]) - len(state["host_requests_count"]), np.int64)
+    ] + count_codes(new_host_codes, state["hosts"])
+
+    host_codes: np.ndarray = np.r_[state["open_hosts"], new_host_codes]
+    times: np.ndarray = np.r_[state["open_times"], df["time"].to_numpy(dtype=np.int64)]
+    url_codes: np.ndarray = np.r_[state["open_urls"], new_url_codes]
+    order: np.ndarray = np.lexsort((times, host_codes))
+    host_codes = host_codes[order]
+    times = times[order]
+    url_codes = url_codes[order]
+
+    is_host_start, gaps = get_host_starts_and_gaps(host_codes, times)
+    session_ids: np.ndarray = assign_session_ids(is_host_start, gaps)
+    session_starts, session_ends, is_host_last_session = get_sessions_bounds(
+        session_ids, is_host_start
+    )
+    session_requests_count: np.ndarray = session_ends - session_starts + 1
+    closed_sessions: np.ndarray = np.flatnonzero(
+        ~is_host_last_session & (session_requests_count > 1)
+    )
+
+    closed_numbers: np.ndarray = np.full(len(session_starts), -1)
+    closed_numbers[closed_sessions] = (
+            np.arange(len(closed_sessions)) + len(state["closed_hosts"])
+    )
+    rows_closed_numbers: np.ndarray = closed_numbers[session_ids]
+    is_pair: np.ndarray = (rows_closed_numbers >= 0) & (url_codes >= 0)
+    pairs: np.ndarray = np.unique(
+        rows_closed_numbers[is_pair] * len(state["urls"]) + url_codes[is_pair]
+    )
 
-    extracted_user_pages: pd.DataFrame = (
-        extracted_users
-            .drop(columns=["requests_count"])
-            .astype(object)
+    state["closed_hosts"] = np.r_[
+        state["closed_hosts"], host_codes[session_starts[closed_sessions]]
+    ]
+    state["closed_duration"] = np.r_[
+        state["closed_duration"],
+        times[session_ends[closed_sessions]] - times[session_starts[closed_sessions]]
+    ]
+    state["closed_requests_count"] = np.r_[
+        state["closed_requests_count"], session_requests_count[closed_sessions]
+    ]
+    state["closed_pairs_sessions"] = np.r_[
+        state["closed_pairs_sessions"], pairs // len(state["urls"])
+    ]
+    state["closed_pairs_urls"] = np.r_[state["closed_pairs_urls"], pairs % len(state["urls"])]
+
+    is_open_row: np.ndarray = is_host_last_session[session_ids]
+    state["open_hosts"] = host_codes[is_open_row]
+    state["open_times"] = times[is_open_row]
+    state["open_urls"] = url_codes[is_open_row]
+
+
+def extract_data_from_sessions_state(state: Dict[str, Any]) -> \
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    url_values: List[str] = list(state["urls"])
+    popular_sites: pd.DataFrame = get_popular_sites(url_values, state["url_counts"])
+    popular_urls: pd.Index = pd.Index(popular_sites["url"])
+    # -1 at the end maps missing urls (code -1) to not popular page
+    url_page_codes: np.ndarray = np.r_[popular_urls.get_indexer(url_values), -1]
+
+    order: np.ndarray = np.argsort(state["closed_hosts"], kind="stable")
+    positions: np.ndarray = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    extracted_sessions = prepare_sessions_frame(
+        state["closed_hosts"][order], state["closed_duration"][order],
+        state["closed_requests_count"][order],
+        prepare_visited_pages(
+            positions[state["closed_pairs_sessions"]],
+            url_page_codes[state["closed_pairs_urls"]], len(order), len(popular_urls)
+        ),
+        popular_urls
     )
-    extracted_sessions_pages: pd.DataFrame = (
-        extracted_sessions
-            .drop(columns=session_additional_cols)
-            .astype(object)
+
+    hosts_number = len(state["hosts"])
+    extracted_users = prepare_users_frame(
+        np.arange(hosts_number), state["host_requests_count"],
+        prepare_visited_pages(
+            state["open_hosts"], url_page_codes[state["open_urls"]],
+            hosts_number, len(popular_urls)
+        ),
+        popular_urls
     )
-    extracted_sessions_numeric: pd.DataFrame = (
-        extracted_sessions[session_additional_cols]
-            .astype(object)
+
+    return modify_extracted_data(
+        extracted_users.reset_index(drop=True), extracted_sessions.reset_index(drop=True)
     )
 
+
+def modify_extracted_data(extracted_users: pd.DataFrame, extracted_sessions: pd.DataFrame) -> \
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    session_additional_cols: List[str] = ["duration", "requests_count", "average_request_duration"]
+
+    extracted_user_pages: pd.DataFrame = extracted_users.drop(columns=["requests_count"])
+    extracted_sessions_pages: pd.DataFrame = extracted_sessions.drop(
+        columns=session_additional_cols
+    )
+    extracted_sessions_numeric: pd.DataFrame = extracted_sessions[session_additional_cols]
+
     return (extracted_users, extracted_sessions, extracted_user_pages,
             extracted_sessions_pages, extracted_sessions_numeric)
 
 
-def get_popular_sites(df: pd.DataFrame) -> pd.DataFrame:
+def load_popular_urls(filepath: str) -> Optional[pd.Index]:
+    if not os.path.exists(filepath):
+        return None
+
+    url_counter = UrlCounter.load(filepath)
+    popular_sites: pd.DataFrame = get_popular_sites(
+        list(url_counter.dictionary), url_counter.counts, url_counter.total
+    )
+    return pd.Index(popular_sites["url"])
+
+
+def get_popular_sites(url_values, url_counts: np.ndarray,
+                      total: Optional[int] = None) -> pd.DataFrame:
     sites_percents: pd.DataFrame = (
-        (df["url"].value_counts(normalize=True) * 100)
-            .rename("percent")
+        pd.Series(
+            url_counts / (url_counts.sum() if total is None else total) * 100,
+            index=pd.Index(url_values, name="url"), name="percent"
+        )
+            .sort_values(ascending=False, kind="stable")
             .reset_index()
-            .rename({"index": "url"}, axis=1)
     )
     return sites_percents[sites_percents["percent"] > POPULAR_SITE_PERCENT]
 
 
-def prepare_popular_sites_with_flag(popular_sites: pd.DataFrame) -> Dict[str, bool]:
-    return {site: False for site in popular_sites["url"]}
+def count_codes(codes: np.ndarray, values) -> np.ndarray:
+    return np.bincount(codes[codes >= 0], minlength=len(values))
+
+
+def save_extracted_data(extracted_users: pd.DataFrame, extracted_sessions: pd.DataFrame,
+                        extracted_user_pages: pd.DataFrame,
+                        extracted_sessions_pages: pd.DataFrame,
+                        extracted_sessions_numeric: pd.DataFrame,
+                        label_suffix: str = "") -> None:
+    print("Saving processed data to files ...")
+    zipped_data = zip(
+        [
+            extracted_users, extracted_sessions, extracted_user_pages,
+            extracted_sessions_pages, extracted_sessions_numeric
+        ],
+        [
+            nameof(extracted_users), nameof(extracted_sessions), nameof(extracted_user_pages),
+            nameof(extracted_sessions_pages), nameof(extracted_sessions_numeric)
+        ]
+    )
+    for data_frame, label in zipped_data:
+        save_df_to_csv_and_arff(data_frame, label + label_suffix, OUTPUT_DIR)
+
+
+def save_df_to_columnar(df: pd.DataFrame, collection_name: str, output_dir: str) -> None:
+    columnar_writer = ColumnarWriter(output_dir + collection_name + COLUMNAR, GROUPING_COLUMNS)
+    columnar_writer.write(df)
+    columnar_writer.close()
 
 
 def save_df_to_csv_and_arff(df: pd.DataFrame, collection_name: str,
                             output_dir: str, add_date: bool = True) -> None:
-    df.to_csv(output_dir + get_filename(collection_name, CSV, add_date), index=False)
-    arff.dump(
-        output_dir + get_filename(collection_name, ARFF, add_date), df.values,
-        relation=collection_name, names=df.columns
+    dataset_writer = DatasetWriter(
+        output_dir + get_filename(collection_name, CSV, add_date),
+        output_dir + get_filename(collection_name, ARFF, add_date), collection_name
     )
+    dataset_writer.write(df)
+    dataset_writer.close()
 
 
 def prepare_args() -> Namespace:
@@ -186,6 +561,36 @@ def prepare_args() -> Namespace:
     arg_parser.add_argument(
         "-g", "--group", default=False, action="store_true", help="Group logs"
     )
+    arg_parser.add_argument(
+        "-st", "--session_timeouts", type=int, nargs="+",
+        help="Group logs for each of given session timeouts in seconds, "
+             "suffix with timeout is added to names of files"
+    )
+    arg_parser.add_argument(
+        "-i", "--incremental", default=False, action="store_true",
+        help="Filter and group logs appended since previous run, state is kept in "
+             + SESSIONS_STATE_PATH
+    )
+    arg_parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Number of processes used for grouping logs, hosts are partitioned between them"
+    )
+    arg_parser.add_argument(
+        "-c", "--chunk_size", type=int, help="Filter logs in chunks with given number of rows"
+    )
+    arg_parser.add_argument(
+        "-e", "--export", default=False, action="store_true",
+        help="Export filtered logs also to csv and arff"
+    )
+    arg_parser.add_argument(
+        "-uc", "--url_counters", type=int,
+        help="Count urls approximately during filtering keeping at most given number of them, "
+             "by default urls are counted exactly"
+    )
+    arg_parser.add_argument(
+        "-a", "--all_rows", default=False, action="store_true",
+        help=f"Read all logs instead of first {ROWS_NUMBER_TO_READ} rows"
+    )
 
     return arg_parser.parse_args()
 
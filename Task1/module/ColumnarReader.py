@@ -0,0 +1,44 @@
+import json
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from module.ColumnarWriter import ColumnarWriter
+
+
+class ColumnarReader:
+    """
+    Opens columns saved by ColumnarWriter as memory mapped arrays,
+    dictionary encoded columns are returned as categorical.
+    """
+
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, ColumnarWriter.META)) as file:
+            meta = json.load(file)
+        self.rows_number: int = meta["rows_number"]
+        self.dtypes = meta["dtypes"]
+
+
+    def read(self, columns: List[str]) -> pd.DataFrame:
+        return pd.DataFrame({column: self._read_column(column) for column in columns}, copy=False)
+
+
+    def _read_column(self, column: str):
+        array = self._open_array(column)
+        values_path = os.path.join(self.directory, column + ColumnarWriter.VALUES)
+        if os.path.exists(values_path):
+            return pd.Categorical.from_codes(array, categories=np.load(values_path))
+        return array
+
+
+    def _open_array(self, column: str) -> np.ndarray:
+        if self.rows_number == 0:
+            return np.empty(0, dtype=self.dtypes[column])
+        return np.memmap(
+            os.path.join(self.directory, column + ColumnarWriter.BIN),
+            dtype=self.dtypes[column], mode="r", shape=(self.rows_number,)
+        )
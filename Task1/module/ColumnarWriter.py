@@ -0,0 +1,73 @@
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from module.utils import encode_values
+
+
+class ColumnarWriter:
+    """
+    Writes selected columns of data frames to directory, one raw binary file per column.
+    String columns are dictionary encoded, codes are stored in binary file
+    and values in order of first appearance in separate .npy file.
+    """
+    META = "meta.json"
+    BIN = ".bin"
+    VALUES = ".values.npy"
+    CODES_DTYPE = "int32"
+
+
+    def __init__(self, directory: str, columns: List[str]) -> None:
+        self.directory = directory
+        self.columns = columns
+        self.rows_number = 0
+        self.dtypes: Dict[str, str] = {}
+        self.dictionaries: Dict[str, Dict[str, int]] = {}
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.files = {
+            column: open(os.path.join(directory, column + ColumnarWriter.BIN), "wb")
+            for column in columns
+        }
+
+
+    def write(self, df: pd.DataFrame) -> None:
+        for column in self.columns:
+            if column not in self.dtypes:
+                self._prepare_column(column, df[column])
+
+            if column in self.dictionaries:
+                array = self._encode(column, df[column])
+            else:
+                array = df[column].to_numpy(dtype=self.dtypes[column])
+            array.tofile(self.files[column])
+
+        self.rows_number += len(df.index)
+
+
+    def close(self) -> None:
+        for column, file in self.files.items():
+            file.close()
+            if column in self.dictionaries:
+                np.save(
+                    os.path.join(self.directory, column + ColumnarWriter.VALUES),
+                    np.array(list(self.dictionaries[column]), dtype=str)
+                )
+
+        with open(os.path.join(self.directory, ColumnarWriter.META), "w") as meta_file:
+            json.dump({"rows_number": self.rows_number, "dtypes": self.dtypes}, meta_file)
+
+
+    def _prepare_column(self, column: str, series: pd.Series) -> None:
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            self.dtypes[column] = series.dtype.str
+        else:
+            self.dtypes[column] = ColumnarWriter.CODES_DTYPE
+            self.dictionaries[column] = {}
+
+
+    def _encode(self, column: str, series: pd.Series) -> np.ndarray:
+        return encode_values(self.dictionaries[column], series).astype(ColumnarWriter.CODES_DTYPE)
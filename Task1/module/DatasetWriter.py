@@ -0,0 +1,131 @@
+from typing import List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class DatasetWriter:
+    """
+    Writes data frames to csv and arff files in one pass. Rows are formatted in batches
+    straight from typed columns, header of arff is prepared from dtypes of first data frame.
+    Data frames with sparse columns are saved as sparse arff.
+    """
+    BATCH_SIZE = 10000
+    CSV_SPECIAL_CHARACTERS = (",", "\"", "\n", "\r")
+
+
+    def __init__(self, csv_path: str, arff_path: str, relation: str) -> None:
+        self.csv_file: TextIO = open(csv_path, "w")
+        self.arff_file: TextIO = open(arff_path, "w")
+        self.relation = relation
+        self.is_sparse: Optional[bool] = None
+
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.is_sparse is None:
+            self.is_sparse = any(isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes)
+            self._write_headers(df)
+
+        for start in range(0, len(df.index), DatasetWriter.BATCH_SIZE):
+            end = min(start + DatasetWriter.BATCH_SIZE, len(df.index))
+            csv_columns: List[List[str]] = []
+            arff_columns: List[List[str]] = []
+            for column in df.columns:
+                csv_values, arff_values = self._format_values(
+                    self._get_dense_values(df[column].array, start, end)
+                )
+                csv_columns.append(csv_values.tolist())
+                arff_columns.append(arff_values.tolist())
+
+            self.csv_file.write("".join([",".join(row) + "\n" for row in zip(*csv_columns)]))
+            if self.is_sparse:
+                self.arff_file.write(self._prepare_sparse_rows(df, start, end))
+            else:
+                self.arff_file.write(
+                    "".join([",".join(row) + "\n" for row in zip(*arff_columns)])
+                )
+
+
+    def close(self) -> None:
+        self.csv_file.close()
+        self.arff_file.close()
+
+
+    def _write_headers(self, df: pd.DataFrame) -> None:
+        self.csv_file.write(",".join([self._quote_csv(str(name)) for name in df.columns]) + "\n")
+        self.arff_file.write("@relation " + self.relation + "\n")
+        for column in df.columns:
+            self.arff_file.write(
+                "@attribute " + str(column) + " " + self._get_arff_type(df[column].dtype) + "\n"
+            )
+        self.arff_file.write("@data\n")
+
+
+    def _prepare_sparse_rows(self, df: pd.DataFrame, start: int, end: int) -> str:
+        rows: List[List[str]] = [[] for _ in range(end - start)]
+        for column_index, column in enumerate(df.columns):
+            array = df[column].array
+            if isinstance(array, pd.arrays.SparseArray):
+                indices = array.sp_index.indices
+                begin, finish = np.searchsorted(indices, [start, end])
+                row_indexes, values = indices[begin:finish] - start, array.sp_values[begin:finish]
+            else:
+                values = array[start:end].to_numpy()
+                row_indexes = np.arange(end - start)
+
+            is_non_zero = values != 0
+            _, arff_values = self._format_values(values[is_non_zero])
+            prefix = str(column_index) + " "
+            for row_index, value in zip(row_indexes[is_non_zero].tolist(), arff_values.tolist()):
+                rows[row_index].append(prefix + value)
+
+        return "".join(["{" + ", ".join(row) + "}\n" for row in rows])
+
+
+    def _get_dense_values(self, array, start: int, end: int) -> np.ndarray:
+        if isinstance(array, pd.arrays.SparseArray):
+            return array[start:end].to_dense()
+        return array[start:end].to_numpy()
+
+
+    def _format_values(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if values.dtype == bool:
+            formatted = np.where(values, "True", "False")
+            return formatted, formatted
+        if np.issubdtype(values.dtype, np.integer):
+            formatted = values.astype(str)
+            return formatted, formatted
+        if np.issubdtype(values.dtype, np.floating):
+            formatted = values.astype(str)
+            is_missing = np.isnan(values)
+            return np.where(is_missing, "", formatted), np.where(is_missing, "?", formatted)
+
+        is_missing = pd.isna(values)
+        csv_values = np.array([
+            "" if missing else self._quote_csv(str(value))
+            for value, missing in zip(values.tolist(), is_missing.tolist())
+        ], dtype=object)
+        arff_values = np.array([
+            "?" if missing else repr(value)
+            for value, missing in zip(values.tolist(), is_missing.tolist())
+        ], dtype=object)
+        return csv_values, arff_values
+
+
+    def _quote_csv(self, value: str) -> str:
+        if any(character in value for character in DatasetWriter.CSV_SPECIAL_CHARACTERS):
+            return "\"" + value.replace("\"", "\"\"") + "\""
+        return value
+
+
+    def _get_arff_type(self, dtype) -> str:
+        if isinstance(dtype, pd.SparseDtype):
+            dtype = dtype.subtype
+        if pd.api.types.is_bool_dtype(dtype):
+            # Omitted values in sparse arff have index 0, so there False must be first
+            return "{False, True}" if self.is_sparse else "{True, False}"
+        if pd.api.types.is_integer_dtype(dtype):
+            return "integer"
+        if pd.api.types.is_float_dtype(dtype):
+            return "real"
+        return "string"
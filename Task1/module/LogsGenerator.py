@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+class LogsGenerator:
+    """
+    Generates deterministic NASA-like access logs with columns of logs.csv.
+    Popularity of pages follows Zipf law, every host has own timeline where
+    gaps between requests are short inside session and long between sessions.
+    """
+    START_TIME = 804571200
+    METHODS = ["GET", "POST", "HEAD"]
+    METHODS_PROBABILITIES = [0.97, 0.02, 0.01]
+    RESPONSES = [200, 304, 302, 404]
+    RESPONSES_PROBABILITIES = [0.88, 0.07, 0.03, 0.02]
+    STATIC_EXTENSIONS = [".gif", ".jpg", ".xbm", ".png"]
+    SESSION_REQUEST_GAP = 30
+    SESSIONS_GAP = 2 * 60 * 60
+
+
+    def __init__(self, hosts_number: int = 10000, pages_number: int = 2000,
+                 zipf_exponent: float = 1.1, static_ratio: float = 0.4,
+                 session_end_probability: float = 0.1, seed: int = 0) -> None:
+        self.hosts_number = hosts_number
+        self.pages_number = pages_number
+        self.zipf_exponent = zipf_exponent
+        self.static_ratio = static_ratio
+        self.session_end_probability = session_end_probability
+        self.seed = seed
+
+
+    def generate(self, rows_number: int) -> pd.DataFrame:
+        rng = np.random.default_rng(self.seed)
+        hosts = rng.integers(0, self.hosts_number, rows_number)
+        times = self._generate_times(rng, hosts)
+        order = np.argsort(times, kind="stable")
+
+        pages = rng.choice(self.pages_number, rows_number, p=self._get_pages_probabilities())
+        is_static = rng.random(rows_number) < self.static_ratio
+        extensions = rng.integers(0, len(LogsGenerator.STATIC_EXTENSIONS), rows_number)
+        url_codes = np.where(
+            is_static, self.pages_number * (extensions + 1) + pages, pages
+        )
+
+        return pd.DataFrame({
+            "host": self._prepare_hosts_names()[hosts[order]],
+            "time": times[order],
+            "method": np.array(LogsGenerator.METHODS, dtype=object)[rng.choice(
+                len(LogsGenerator.METHODS), rows_number, p=LogsGenerator.METHODS_PROBABILITIES
+            )],
+            "url": self._prepare_urls()[url_codes[order]],
+            "response": np.array(LogsGenerator.RESPONSES)[rng.choice(
+                len(LogsGenerator.RESPONSES), rows_number,
+                p=LogsGenerator.RESPONSES_PROBABILITIES
+            )],
+            "bytes": rng.integers(0, 100000, rows_number)
+        })
+
+
+    def _generate_times(self, rng: np.random.Generator, hosts: np.ndarray) -> np.ndarray:
+        is_session_end = rng.random(len(hosts)) < self.session_end_probability
+        gaps = np.where(
+            is_session_end,
+            rng.exponential(LogsGenerator.SESSIONS_GAP, len(hosts)),
+            rng.exponential(LogsGenerator.SESSION_REQUEST_GAP, len(hosts))
+        ).astype(np.int64)
+
+        # Cumulative sum of gaps restarted for every host
+        by_host = np.argsort(hosts, kind="stable")
+        sorted_hosts = hosts[by_host]
+        cumulative_gaps = np.cumsum(gaps[by_host])
+        host_starts = np.flatnonzero(np.diff(sorted_hosts, prepend=-1) != 0)
+        host_offsets = np.repeat(
+            cumulative_gaps[host_starts] - gaps[by_host][host_starts],
+            np.diff(np.r_[host_starts, len(hosts)])
+        )
+        first_requests = rng.integers(0, LogsGenerator.SESSIONS_GAP, self.hosts_number)
+
+        times = np.empty(len(hosts), dtype=np.int64)
+        times[by_host] = (
+                LogsGenerator.START_TIME + first_requests[sorted_hosts]
+                + cumulative_gaps - host_offsets
+        )
+        return times
+
+
+    def _get_pages_probabilities(self) -> np.ndarray:
+        weights = 1 / np.arange(1, self.pages_number + 1) ** self.zipf_exponent
+        return weights / weights.sum()
+
+
+    def _prepare_hosts_names(self) -> np.ndarray:
+        return np.array(
+            ["host" + str(index) + ".example.com" for index in range(self.hosts_number)],
+            dtype=object
+        )
+
+
+    def _prepare_urls(self) -> np.ndarray:
+        pages = ["/pages/page" + str(index) + ".html" for index in range(self.pages_number)]
+        static = [
+            "/images/image" + str(index) + extension
+            for extension in LogsGenerator.STATIC_EXTENSIONS
+            for index in range(self.pages_number)
+        ]
+        return np.array(pages + static, dtype=object)
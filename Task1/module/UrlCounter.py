@@ -0,0 +1,70 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from module.utils import encode_values
+
+
+class UrlCounter:
+    """
+    Counts urls in one pass over chunks of logs. Without capacity counting is exact,
+    with capacity at most that many urls are kept (Misra-Gries summary), each kept count
+    is underestimated by at most error_bound <= total / (capacity + 1).
+    """
+
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.capacity = capacity
+        self.dictionary: Dict[str, int] = {}
+        self.counts: np.ndarray = np.empty(0, dtype=np.int64)
+        self.total = 0
+        self.error_bound = 0
+
+
+    def update(self, urls: pd.Series) -> None:
+        codes = encode_values(self.dictionary, urls)
+        codes = codes[codes >= 0]
+        self.total += len(codes)
+        self.counts = np.r_[
+            self.counts, np.zeros(len(self.dictionary) - len(self.counts), dtype=np.int64)
+        ] + np.bincount(codes, minlength=len(self.dictionary))
+
+        if self.capacity is not None and len(self.counts) > self.capacity:
+            self._reduce(self.capacity)
+
+
+    def get_counts(self) -> pd.Series:
+        return pd.Series(self.counts, index=pd.Index(list(self.dictionary), name="url"))
+
+
+    def save(self, filepath: str) -> None:
+        np.savez(
+            filepath, urls=np.array(list(self.dictionary), dtype=str), counts=self.counts,
+            total=self.total, error_bound=self.error_bound
+        )
+
+
+    @staticmethod
+    def load(filepath: str) -> "UrlCounter":
+        url_counter = UrlCounter()
+        with np.load(filepath) as arrays:
+            url_counter.dictionary = {
+                url: code for code, url in enumerate(arrays["urls"].tolist())
+            }
+            url_counter.counts = arrays["counts"]
+            url_counter.total = int(arrays["total"])
+            url_counter.error_bound = int(arrays["error_bound"])
+        return url_counter
+
+
+    def _reduce(self, capacity: int) -> None:
+        decrement = np.partition(self.counts, -(capacity + 1))[-(capacity + 1)]
+        self.counts = self.counts - decrement
+        self.error_bound += int(decrement)
+        is_kept = self.counts > 0
+        self.dictionary = {
+            url: code for code, url
+            in enumerate(np.array(list(self.dictionary), dtype=object)[is_kept].tolist())
+        }
+        self.counts = self.counts[is_kept]
@@ -0,0 +1,15 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+def encode_values(dictionary: Dict[str, int], series: pd.Series) -> np.ndarray:
+    """New values are added to dictionary in order of first appearance"""
+    codes, uniques = pd.factorize(series)
+    for value in uniques:
+        if value not in dictionary:
+            dictionary[value] = len(dictionary)
+
+    # -1 at the end keeps code of missing values
+    return np.array([dictionary[value] for value in uniques] + [-1], dtype=np.int64)[codes]
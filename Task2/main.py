@@ -1,27 +1,73 @@
+import glob
+import hashlib
+import html
 import os
+import re
+import shutil
 import subprocess
 import sys
+import time
+import zlib
 from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import arff
 import html2text
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from module.Crawler import Crawler
+
 """
     How to run:
         python main.py -f data/ftims.html --plain
+        python main.py -f data/ftims.html --plain --stream
         python main.py -f output/ftims.txt --arff
+        python main.py -f output/ftims.txt --dtm --tfidf --stem
+        python main.py -f output/ftims.txt --arff --dedup 0.9
+        python main.py --batch "data/*.html" -w 4
+        python main.py --batch "data/*.html" --no-cache
+        python main.py --crawl https://ftims.p.lodz.pl/ --depth 2 --max_pages 100
+        Crawl local copy:   python -m http.server 8000 --directory data
+                            python main.py --crawl http://localhost:8000/ --depth 1
 """
 
 # VAR ------------------------------------------------------------------------ #
 UTF_8: str = "utf-8"
+DATA_DIR: str = "data/"
 OUTPUT_DIR: str = "output/"
+CACHE_DIR: str = OUTPUT_DIR + ".cache/"
+CACHE_SIZE_MB: int = 512
+HASH_BLOCK_SIZE: int = 1024 * 1024
+STOPWORDS_PATH: str = DATA_DIR + "polish_stopwords.txt"
+DTM: str = "_dtm"
+DUPLICATES: str = "_duplicates"
+NPZ: str = ".npz"
 CSV: str = ".csv"
 ARFF: str = ".arff"
 TXT: str = ".txt"
+HTML: str = ".html"
 TERM = "Page "
+PAGE_BREAK = "<DIV STYLE=\"page-break-after: always;\">"
+CONCATENATION_START = "<HTML><HEAD><TITLE>Concatenation</TITLE></HEAD><BODY>\n"
+CONCATENATION_END = "</BODY></HTML>\n"
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+STEM_MIN_LENGTH = 3
+POLISH_SUFFIXES: List[str] = sorted([
+    "owania", "owanie", "owaniu", "ami", "ach", "ego", "emu", "ich", "ych", "imi", "ymi", "owi",
+    "ową", "owe", "owy", "om", "ów", "ie", "ia", "ii", "ej", "ym", "im", "ą", "ę", "a",
+    "e", "i", "o", "u", "y"
+], key=len, reverse=True)
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 128
+MINHASH_PRIME = 4294967291
+MINHASH_SEED = 0
 
 
 # MAIN ----------------------------------------------------------------------- #
@@ -32,51 +78,444 @@ def main() -> None:
     to_plain = args.plain
     to_arff = args.arff
 
-    if to_plain:
-        convert_html_to_plain(filepath)
+    cache_size_mb = None if args.no_cache else args.cache_size
+
+    if args.batch is not None:
+        convert_files_in_batch(args.batch, args.workers, args.stream, args.dedup, cache_size_mb)
+    elif args.crawl is not None:
+        crawl_and_convert(Crawler(
+            args.crawl, args.depth, args.max_pages, args.concurrency, args.rate, args.scope,
+            not args.ignore_robots
+        ), args.dedup)
+    elif to_plain:
+        convert_html_to_plain_with_cache(filepath, args.stream, cache_size_mb)
     elif to_arff:
-        convert_plain_text_to_arff(filepath)
+        convert_plain_text_to_arff_with_cache(filepath, args.dedup, cache_size_mb)
+    elif args.dtm:
+        run_with_cache(
+            filepath, ["dtm", args.tfidf, args.stem, args.dedup, hash_file(STOPWORDS_PATH)],
+            get_document_term_matrix_paths(filepath, args.dedup),
+            lambda: convert_plain_text_to_document_term_matrix(
+                filepath, args.tfidf, args.stem, args.dedup
+            ),
+            cache_size_mb
+        )
 
     display_finish()
 
 
 # DEF ------------------------------------------------------------------------ #
+def convert_files_in_batch(pattern: str, workers: int, stream: bool,
+                           dedup_threshold: Optional[float] = None,
+                           cache_size_mb: Optional[int] = None) -> None:
+    filepaths = find_files_to_convert(pattern)
+    print("Converting " + str(len(filepaths)) + " files ...")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(convert_file, filepath, stream, dedup_threshold, cache_size_mb)
+            for filepath in filepaths
+        ]
+        for future in as_completed(futures):
+            filepath, plain_seconds, arff_seconds = future.result()
+            print(
+                filepath + " - plain: " + str(round(plain_seconds, 3)) + " s, arff: "
+                + str(round(arff_seconds, 3)) + " s"
+            )
+
+    print("Total time: " + str(round(time.perf_counter() - start, 3)) + " s")
+
+
+def crawl_and_convert(crawler: Crawler, dedup_threshold: Optional[float] = None) -> None:
+    """
+    Fetched pages are concatenated in websphinx format into html file in data directory and
+    converted to plain text as they come, then plain text is converted to arff
+    """
+    html_path = DATA_DIR + urlsplit(crawler.start_urls[0]).netloc.replace(":", "_") + HTML
+    with open(html_path, "w", encoding=UTF_8) as html_file, open(
+            get_plain_text_path(html_path), "w", encoding=UTF_8
+    ) as text_file:
+        def save_page(url: str, title: str, page: str) -> None:
+            page_html = prepare_concatenated_page(crawler.pages_number, url, title, page)
+            html_file.write(page_html)
+            text_file.write(html2text.html2text(page_html))
+            print("Page " + str(crawler.pages_number) + ": " + url)
+
+        crawler.crawl(save_page)
+        html_file.write(CONCATENATION_END)
+
+    print("Crawled " + str(crawler.pages_number) + " pages to " + html_path)
+    convert_plain_text_to_arff(get_plain_text_path(html_path), dedup_threshold)
+
+
+def prepare_concatenated_page(page_number: int, url: str, title: str, page: str) -> str:
+    """First page starts document, next pages start with page break like in websphinx"""
+    start = CONCATENATION_START if page_number == 1 else PAGE_BREAK + "<HR></DIV>\n"
+    return (
+        start + "<TABLE WIDTH=\"100%\"><TR>\n<TD ALIGN=left><A NAME=\"page" + str(page_number)
+        + "\">" + html.escape(title) + " [" + html.escape(url) + "]</A>\n<TD ALIGN=right>Page "
+        + str(page_number) + "</TABLE>\n" + page + "\n"
+    )
+
+
+def find_files_to_convert(pattern: str) -> List[str]:
+    if os.path.isdir(pattern):
+        return sorted(
+            glob.glob(os.path.join(pattern, "*" + HTML))
+            + glob.glob(os.path.join(pattern, "*" + TXT))
+        )
+    return sorted(glob.glob(pattern))
+
+
+def convert_file(filepath: str, stream: bool, dedup_threshold: Optional[float] = None,
+                 cache_size_mb: Optional[int] = None) -> Tuple[str, float, float]:
+    """HTML file is converted to plain text first, then plain text is converted to arff"""
+    plain_seconds = 0.0
+    plain_text_filepath = filepath
+    if filepath.endswith(HTML):
+        start = time.perf_counter()
+        convert_html_to_plain_with_cache(filepath, stream, cache_size_mb)
+        plain_seconds = time.perf_counter() - start
+        plain_text_filepath = get_plain_text_path(filepath)
+
+    start = time.perf_counter()
+    convert_plain_text_to_arff_with_cache(plain_text_filepath, dedup_threshold, cache_size_mb)
+    return filepath, plain_seconds, time.perf_counter() - start
+
+
+def convert_html_to_plain_with_cache(filepath: str, stream: bool,
+                                     cache_size_mb: Optional[int]) -> None:
+    run_with_cache(
+        filepath, ["plain", stream], [get_plain_text_path(filepath)],
+        partial(convert_html_to_plain_in_stream if stream else convert_html_to_plain, filepath),
+        cache_size_mb
+    )
+
+
+def convert_plain_text_to_arff_with_cache(filepath: str, dedup_threshold: Optional[float],
+                                          cache_size_mb: Optional[int]) -> None:
+    output_paths = [
+        OUTPUT_DIR + prepare_filename(get_filename_from_path(filepath), extension, False)
+        for extension in [CSV, ARFF]
+    ]
+    if dedup_threshold is not None:
+        output_paths.append(get_duplicates_report_path(filepath))
+    run_with_cache(
+        filepath, ["arff", dedup_threshold], output_paths,
+        lambda: convert_plain_text_to_arff(filepath, dedup_threshold), cache_size_mb
+    )
+
+
+def run_with_cache(filepath: str, options: List, output_paths: List[str],
+                   convert: Callable[[], None], cache_size_mb: Optional[int]) -> None:
+    """
+    Outputs are cached under hash of input file content and options of conversion, on hit
+    they are copied from cache instead of converting. Cache is disabled when size is None,
+    least recently used entries are evicted when cache exceeds size.
+    """
+    if cache_size_mb is None:
+        convert()
+        return
+
+    key = hashlib.sha256((hash_file(filepath) + repr(options)).encode(UTF_8)).hexdigest()
+    entry_path = CACHE_DIR + key + "/"
+    cached_paths = [entry_path + os.path.basename(path) for path in output_paths]
+    if all(os.path.exists(path) for path in cached_paths):
+        print("Cache hit for " + filepath + ", conversion skipped")
+        for cached_path, output_path in zip(cached_paths, output_paths):
+            shutil.copyfile(cached_path, output_path)
+        os.utime(entry_path)
+        return
+
+    convert()
+    # Entry is prepared under temporary name and renamed, so other processes never read it
+    # half written
+    temporary_path = CACHE_DIR + key + "-" + str(os.getpid()) + ".tmp/"
+    create_directory(temporary_path)
+    for output_path, cached_path in zip(output_paths, cached_paths):
+        shutil.copyfile(output_path, temporary_path + os.path.basename(cached_path))
+    shutil.rmtree(entry_path, ignore_errors=True)
+    try:
+        os.rename(temporary_path, entry_path)
+    except OSError:
+        shutil.rmtree(temporary_path, ignore_errors=True)
+    evict_cache_entries(cache_size_mb * 1024 * 1024)
+
+
+def evict_cache_entries(max_bytes: int) -> None:
+    entries: List[Tuple[float, int, str]] = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.is_dir() and not entry.name.endswith(".tmp"):
+            size = sum(file.stat().st_size for file in os.scandir(entry.path))
+            entries.append((entry.stat().st_mtime, size, entry.path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total_bytes -= size
+
+
+def hash_file(filepath: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
 def convert_html_to_plain(filepath: str) -> None:
     with open(filepath) as file:
         plain_text = html2text.html2text(file.read())
 
-    with open(OUTPUT_DIR + get_filename_from_path(filepath) + TXT, "w", encoding=UTF_8) as file:
+    with open(get_plain_text_path(filepath), "w", encoding=UTF_8) as file:
         file.write(plain_text)
 
 
-def convert_plain_text_to_arff(filepath: str) -> None:
-    df = pd.DataFrame(columns=["title", "content"])
+def convert_html_to_plain_in_stream(filepath: str) -> None:
+    with open(filepath) as html_file, open(
+            get_plain_text_path(filepath), "w", encoding=UTF_8
+    ) as text_file:
+        for page in tqdm(read_html_pages(html_file)):
+            text_file.write(html2text.html2text(page))
+
+
+def read_html_pages(lines: Iterable[str]) -> Iterator[str]:
+    """Concatenated pages are split before page break which websphinx puts between them"""
+    page_lines: List[str] = []
+    for line in lines:
+        if PAGE_BREAK in line:
+            before, _, after = line.partition(PAGE_BREAK)
+            page_lines.append(before)
+            yield "".join(page_lines)
+            page_lines = [PAGE_BREAK + after]
+        else:
+            page_lines.append(line)
+
+    if len(page_lines) > 0:
+        yield "".join(page_lines)
+
+
+def convert_plain_text_to_arff(filepath: str, dedup_threshold: Optional[float] = None) -> None:
+    with open(filepath, encoding=UTF_8) as file:
+        pages = split_to_pages(tqdm(file))
+    if dedup_threshold is not None:
+        pages = remove_near_duplicate_pages(pages, dedup_threshold, filepath)
+
+    df = pd.DataFrame(pages, columns=["title", "content"])
+    save_df_to_csv_and_arff(df, get_filename_from_path(filepath), False)
+
+
+def split_to_pages(lines: Iterable[str]) -> List[List[str]]:
+    """Last page is skipped, as well as pages without title in brackets"""
+    pages: List[List[str]] = []
     page_counter = 0
     line_back = ""
     title = ""
-    content = ""
+    content: List[str] = []
+
+    for line in lines:
+        if TERM in line:
+            if title != "":
+                pages.append([TERM + str(page_counter), "".join(content)])
+                page_counter += 1
+            result = line.partition("[")[2].partition("]")[0]
+            if result == "":
+                result = line_back.partition("[")[2].partition("]")[0]
+            title = result
+            content = []
+        else:
+            content.append(line)
+        line_back = line
+
+    return pages
+
+
+def remove_near_duplicate_pages(pages: List[List[str]], threshold: float,
+                                filepath: str) -> List[List[str]]:
+    """
+    Page is removed when Jaccard similarity of its shingles with earlier kept page is at least
+    threshold. Only kept pages sharing LSH bucket of MinHash signature are compared exactly,
+    removed pages are reported in csv.
+    """
+    shingles = [prepare_shingles(content) for _, content in pages]
+    signatures = calculate_minhash_signatures(shingles)
+    bands, rows = choose_lsh_bands(threshold)
+    buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+
+    kept: List[List[str]] = []
+    removed: List[List] = []
+    for index, page in enumerate(pages):
+        keys = [signatures[index, band * rows:(band + 1) * rows].tobytes() for band in range(bands)]
+        candidates = set(chain.from_iterable(
+            band_buckets.get(key, []) for band_buckets, key in zip(buckets, keys)
+        ))
+
+        duplicate_of, similarity = -1, 0.0
+        for candidate in sorted(candidates):
+            jaccard = calculate_jaccard_similarity(shingles[index], shingles[candidate])
+            if jaccard >= threshold and jaccard > similarity:
+                duplicate_of, similarity = candidate, jaccard
+
+        if duplicate_of < 0:
+            kept.append(page)
+            for band_buckets, key in zip(buckets, keys):
+                band_buckets.setdefault(key, []).append(index)
+        else:
+            removed.append([page[0], pages[duplicate_of][0], similarity])
+
+    report_path = get_duplicates_report_path(filepath)
+    pd.DataFrame(removed, columns=["title", "duplicate_of", "similarity"]).to_csv(
+        report_path, index=False
+    )
+    print(
+        "Removed " + str(len(removed)) + " of " + str(len(pages))
+        + " pages as near-duplicates, report saved to " + report_path
+    )
+    return kept
+
+
+def prepare_shingles(content: str) -> np.ndarray:
+    """Returns sorted unique hashes of word shingles, short content is one shingle"""
+    words = WORD_PATTERN.findall(content.lower())
+    shingles = [
+        " ".join(words[index:index + SHINGLE_SIZE])
+        for index in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    ]
+    return np.unique(np.array(
+        [zlib.crc32(shingle.encode(UTF_8)) for shingle in shingles], dtype=np.uint64
+    ))
+
+
+def calculate_minhash_signatures(shingles: List[np.ndarray]) -> np.ndarray:
+    """
+    Every permutation is universal hash (a * x + b) mod prime, hashes and coefficients
+    are below 2^32 so products fit in uint64
+    """
+    rng = np.random.default_rng(MINHASH_SEED)
+    a = rng.integers(1, MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)[:, np.newaxis]
+    b = rng.integers(0, MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)[:, np.newaxis]
+
+    signatures = np.empty((len(shingles), MINHASH_PERMUTATIONS), dtype=np.uint64)
+    for index, hashes in enumerate(shingles):
+        signatures[index] = ((a * hashes + b) % np.uint64(MINHASH_PRIME)).min(axis=1)
+    return signatures
+
+
+def choose_lsh_bands(threshold: float) -> Tuple[int, int]:
+    """
+    Returns numbers of bands and rows per band. Probability of becoming candidate rises
+    the fastest around similarity (1 / bands) ^ (1 / rows), the highest one not above
+    threshold is chosen, so that few duplicates are missed.
+    """
+    options = [
+        (MINHASH_PERMUTATIONS // rows, rows) for rows in range(1, MINHASH_PERMUTATIONS + 1)
+        if MINHASH_PERMUTATIONS % rows == 0
+    ]
+    return max(
+        [(bands, rows) for bands, rows in options if (1 / bands) ** (1 / rows) <= threshold],
+        key=lambda option: (1 / option[0]) ** (1 / option[1]), default=options[0]
+    )
+
+
+def calculate_jaccard_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    intersection = len(np.intersect1d(first, second, assume_unique=True))
+    return intersection / (len(first) + len(second) - intersection)
+
 
+def convert_plain_text_to_document_term_matrix(filepath: str, tfidf: bool, stem: bool,
+                                               dedup_threshold: Optional[float] = None) -> None:
     with open(filepath, encoding=UTF_8) as file:
-        for line in tqdm(file):
-            line.strip().split("/n")
-            if TERM in line:
-                if title != "":
-                    title = TERM + str(page_counter)
-                    page_counter += 1
-                    df.loc[-1] = [title, content]
-                    df.index = df.index + 1
-                    df = df.sort_index()
-                result = line.partition("[")[2].partition("]")[0]
-                if result == "":
-                    result = line_back.partition("[")[2].partition("]")[0]
-                title = result
-                content = ""
-            else:
-                content += line
-            line_back = line
-
-    df = df[::-1]
-    save_df_to_csv_and_arff(df, get_filename_from_path(filepath), False)
+        pages = split_to_pages(tqdm(file))
+    if dedup_threshold is not None:
+        pages = remove_near_duplicate_pages(pages, dedup_threshold, filepath)
+
+    with open(STOPWORDS_PATH, encoding=UTF_8) as file:
+        stopwords: Set[str] = {line.strip() for line in file if line.strip() != ""}
+
+    titles = [title for title, _ in pages]
+    indptr, indices, values, terms = prepare_document_term_matrix(
+        [content for _, content in pages], stopwords, tfidf, stem
+    )
+    filename = get_filename_from_path(filepath) + DTM
+    np.savez(
+        OUTPUT_DIR + filename + NPZ, indptr=indptr, indices=indices, data=values,
+        shape=np.array([len(titles), len(terms)]), terms=np.array(terms, dtype=str),
+        titles=np.array(titles, dtype=str)
+    )
+    save_document_term_matrix_to_sparse_arff(titles, indptr, indices, values, terms, filename)
+
+
+def prepare_document_term_matrix(contents: List[str], stopwords: Set[str], tfidf: bool,
+                                 stem: bool) -> \
+        Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Returns matrix in CSR format (indptr, indices, values) and terms. Words of all documents
+    are encoded with one vocabulary and counted together, stopwords and stems are resolved
+    once per vocabulary word instead of once per token.
+    """
+    words_per_document = [WORD_PATTERN.findall(content.lower()) for content in contents]
+    document_ids = np.repeat(
+        np.arange(len(contents)), [len(words) for words in words_per_document]
+    )
+    term_codes, vocabulary = pd.factorize(
+        np.array(list(chain.from_iterable(words_per_document)), dtype=object)
+    )
+
+    is_kept_term = ~pd.Index(vocabulary).isin(stopwords)
+    if stem:
+        stems = [stem_polish_word(word) for word in vocabulary]
+    else:
+        stems = list(vocabulary)
+    stem_codes, terms = pd.factorize(np.array(stems, dtype=object)[is_kept_term])
+    vocabulary_codes = np.full(len(vocabulary) + 1, -1)
+    vocabulary_codes[np.flatnonzero(is_kept_term)] = stem_codes
+
+    term_codes = vocabulary_codes[term_codes]
+    is_kept_token = term_codes >= 0
+    keys, counts = np.unique(
+        document_ids[is_kept_token] * len(terms) + term_codes[is_kept_token], return_counts=True
+    )
+    rows, indices = np.divmod(keys, max(len(terms), 1))
+
+    values: np.ndarray = counts
+    if tfidf:
+        document_frequency = np.bincount(indices, minlength=len(terms))
+        values = counts * np.log(len(contents) / document_frequency[indices])
+        # Terms present in all documents get zero weight and are not stored
+        is_non_zero = values != 0
+        rows, indices, values = rows[is_non_zero], indices[is_non_zero], values[is_non_zero]
+
+    indptr = np.searchsorted(rows, np.arange(len(contents) + 1))
+    return indptr, indices, values, list(terms)
+
+
+def stem_polish_word(word: str) -> str:
+    """Light stemming, the longest matching inflection suffix is cut off"""
+    for suffix in POLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= STEM_MIN_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def save_document_term_matrix_to_sparse_arff(titles: List[str], indptr: np.ndarray,
+                                             indices: np.ndarray, values: np.ndarray,
+                                             terms: List[str], filename: str) -> None:
+    with open(OUTPUT_DIR + prepare_filename(filename, ARFF, False), "w", encoding=UTF_8) as file:
+        file.write("@relation " + filename + "\n")
+        file.write("@attribute title string\n")
+        for term in terms:
+            file.write("@attribute " + term + " numeric\n")
+        file.write("@data\n")
+
+        for index, title in enumerate(titles):
+            start, end = indptr[index], indptr[index + 1]
+            file.write("{0 " + repr(title) + "".join([
+                ", " + str(column + 1) + " " + str(value)
+                for column, value in zip(indices[start:end].tolist(), values[start:end].tolist())
+            ]) + "}\n")
 
 
 def save_df_to_csv_and_arff(df: pd.DataFrame, filename: str, add_date: bool = True) -> None:
@@ -87,6 +526,23 @@ def save_df_to_csv_and_arff(df: pd.DataFrame, filename: str, add_date: bool = Tr
     )
 
 
+def get_plain_text_path(filepath: str) -> str:
+    return OUTPUT_DIR + get_filename_from_path(filepath) + TXT
+
+
+def get_document_term_matrix_paths(filepath: str,
+                                   dedup_threshold: Optional[float]) -> List[str]:
+    filename = get_filename_from_path(filepath) + DTM
+    paths = [OUTPUT_DIR + filename + NPZ, OUTPUT_DIR + prepare_filename(filename, ARFF, False)]
+    if dedup_threshold is not None:
+        paths.append(get_duplicates_report_path(filepath))
+    return paths
+
+
+def get_duplicates_report_path(filepath: str) -> str:
+    return OUTPUT_DIR + get_filename_from_path(filepath) + DUPLICATES + CSV
+
+
 def get_filename_from_path(filepath: str) -> str:
     return os.path.splitext(os.path.basename(filepath))[0]
 
@@ -104,8 +560,40 @@ def create_directory(path: str) -> None:
 def prepare_args() -> Namespace:
     arg_parser = ArgumentParser()
 
+    files_group = arg_parser.add_mutually_exclusive_group(required=True)
+    files_group.add_argument(
+        "-f", "--filepath", type=str, help="HTML or plain text filepath"
+    )
+    files_group.add_argument(
+        "--batch", type=str,
+        help="Directory or glob pattern of HTML and plain text files, HTML files are converted "
+             "to plain text and then every plain text is converted to arff"
+    )
+    files_group.add_argument(
+        "--crawl", type=str, nargs="+",
+        help="Start urls, crawled pages are saved to data directory and converted to arff"
+    )
+    arg_parser.add_argument(
+        "--depth", type=int, default=2, help="Maximum number of links from start url"
+    )
+    arg_parser.add_argument(
+        "--max_pages", type=int, default=100, help="Maximum number of crawled pages"
+    )
+    arg_parser.add_argument(
+        "--concurrency", type=int, default=8, help="Maximum number of concurrent requests"
+    )
+    arg_parser.add_argument(
+        "--rate", type=float, default=2.0, help="Maximum number of requests per second to host"
+    )
     arg_parser.add_argument(
-        "-f", "--filepath", required=True, type=str, help="HTML or plain text filepath"
+        "--scope", type=str, nargs="+",
+        help="Url prefixes of crawled pages, by default pages of hosts of start urls"
+    )
+    arg_parser.add_argument(
+        "--ignore_robots", default=False, action="store_true", help="Do not follow robots.txt"
+    )
+    arg_parser.add_argument(
+        "-w", "--workers", type=int, help="Number of processes used in batch, all cores by default"
     )
     arg_parser.add_argument(
         "--plain", default=False, action="store_true", help="Convert HTML to plain text"
@@ -113,6 +601,35 @@ def prepare_args() -> Namespace:
     arg_parser.add_argument(
         "--arff", default=False, action="store_true", help="Convert plain text to arff"
     )
+    arg_parser.add_argument(
+        "--dtm", default=False, action="store_true",
+        help="Convert plain text to sparse document-term matrix saved as arff and npz"
+    )
+    arg_parser.add_argument(
+        "--tfidf", default=False, action="store_true",
+        help="Use TF-IDF instead of term frequency in document-term matrix"
+    )
+    arg_parser.add_argument(
+        "--stem", default=False, action="store_true",
+        help="Cut off Polish inflection suffixes of words in document-term matrix"
+    )
+    arg_parser.add_argument(
+        "--dedup", type=float,
+        help="Remove pages whose Jaccard similarity of word shingles with earlier page is at "
+             "least given threshold, before saving arff or document-term matrix"
+    )
+    arg_parser.add_argument(
+        "--no-cache", dest="no_cache", default=False, action="store_true",
+        help="Always convert, without reading or writing cache of outputs"
+    )
+    arg_parser.add_argument(
+        "--cache_size", type=int, default=CACHE_SIZE_MB,
+        help="Maximum size of cache of outputs in MB, least recently used entries are evicted"
+    )
+    arg_parser.add_argument(
+        "--stream", default=False, action="store_true",
+        help="Convert HTML to plain text page by page, memory is bounded by the largest page"
+    )
 
     return arg_parser.parse_args()
 
@@ -0,0 +1,221 @@
+import asyncio
+import re
+import ssl
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote, urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from module.PageParser import PageParser
+
+
+class Crawler:
+    """
+    Asynchronous breadth-first crawler built on asyncio streams. At most concurrency
+    requests are in flight and requests to one host are started at least 1 / rate seconds
+    apart (or crawl delay of robots.txt if longer). Links are followed up to max_depth
+    when they are in scope: start with one of scope prefixes or, without prefixes, point to
+    one of hosts of start urls. Every fetched HTML page is passed to on_page(url, title, html).
+    """
+    USER_AGENT = "EDI-Crawler"
+    TIMEOUT = 10.0
+    MAX_PAGE_BYTES = 10 * 1024 * 1024
+    REDIRECTS = (301, 302, 303, 307, 308)
+    CHARSET_PATTERN = re.compile(rb"charset=[\"']?([\w-]+)", re.IGNORECASE)
+    URL_SAFE_CHARACTERS = "/%:@!$&'()*+,;=-._~?"
+
+
+    def __init__(self, start_urls: List[str], max_depth: int = 2, max_pages: int = 100,
+                 concurrency: int = 8, rate: float = 2.0,
+                 scope: Optional[List[str]] = None, respect_robots: bool = True) -> None:
+        self.start_urls = start_urls
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.rate = rate
+        self.scope = scope or []
+        self.respect_robots = respect_robots
+        self.start_hosts = {urlsplit(url).hostname for url in start_urls}
+        self.pages_number = 0
+        self._seen: Set[str] = set()
+        # Parsed robots.txt or verdict for all urls of origin, when there is no robots.txt
+        self._robots: Dict[str, Union[RobotFileParser, bool]] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._next_request_times: Dict[str, float] = {}
+
+
+    def crawl(self, on_page: Callable[[str, str, str], None]) -> int:
+        """Returns number of fetched pages"""
+        return asyncio.run(self._crawl(on_page))
+
+
+    async def _crawl(self, on_page: Callable[[str, str, str], None]) -> int:
+        queue: asyncio.Queue = asyncio.Queue()
+        for url in self.start_urls:
+            self._enqueue(queue, url, 0)
+
+        workers = [
+            asyncio.create_task(self._work(queue, on_page)) for _ in range(self.concurrency)
+        ]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return self.pages_number
+
+
+    async def _work(self, queue: asyncio.Queue, on_page: Callable[[str, str, str], None]) -> None:
+        while True:
+            url, depth = await queue.get()
+            try:
+                await self._visit(queue, url, depth, on_page)
+            # One bad page must not stop worker, otherwise queue would never be joined
+            except Exception as error:
+                print("Skipped " + url + ": " + repr(error))
+            finally:
+                queue.task_done()
+
+
+    async def _visit(self, queue: asyncio.Queue, url: str, depth: int,
+                     on_page: Callable[[str, str, str], None]) -> None:
+        if self.pages_number >= self.max_pages or not await self._is_allowed(url):
+            return
+
+        status, headers, body = await self._fetch(url)
+        if status in Crawler.REDIRECTS and "location" in headers:
+            self._enqueue(queue, urljoin(url, headers["location"]), depth)
+            return
+        if status != 200 or "html" not in headers.get("content-type", "text/html"):
+            return
+
+        html = self._decode(headers, body)
+        parser = PageParser()
+        parser.feed(html)
+        # Other workers may have reached the limit while this page was fetched
+        if self.pages_number >= self.max_pages:
+            return
+        self.pages_number += 1
+        on_page(url, " ".join(parser.title.split()), html)
+
+        if depth < self.max_depth:
+            for link in parser.links:
+                self._enqueue(queue, urljoin(url, link), depth + 1)
+
+
+    def _enqueue(self, queue: asyncio.Queue, url: str, depth: int) -> None:
+        url = urldefrag(url)[0]
+        if url not in self._seen and self._is_in_scope(url):
+            self._seen.add(url)
+            queue.put_nowait((url, depth))
+
+
+    def _is_in_scope(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return False
+        if len(self.scope) > 0:
+            return any(url.startswith(prefix) for prefix in self.scope)
+        return parts.hostname in self.start_hosts
+
+
+    async def _is_allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+
+        parts = urlsplit(url)
+        origin = parts.scheme + "://" + parts.netloc
+        async with self._get_host_lock("robots " + origin):
+            if origin not in self._robots:
+                try:
+                    status, _, body = await self._fetch(origin + "/robots.txt")
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    status, body = 0, b""
+                if status == 200:
+                    parser = RobotFileParser()
+                    parser.parse(body.decode("utf-8", errors="replace").splitlines())
+                    self._robots[origin] = parser
+                else:
+                    self._robots[origin] = status not in (401, 403)
+
+        robots = self._robots[origin]
+        if isinstance(robots, RobotFileParser):
+            return robots.can_fetch(Crawler.USER_AGENT, url)
+        return robots
+
+
+    async def _fetch(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """HTTP/1.0 request, so response is not chunked and connection is closed after it"""
+        parts = urlsplit(url)
+        await self._wait_for_turn(parts.scheme + "://" + parts.netloc)
+
+        is_https = parts.scheme == "https"
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(
+            parts.hostname, parts.port or (443 if is_https else 80),
+            ssl=ssl.create_default_context() if is_https else None
+        ), Crawler.TIMEOUT)
+        try:
+            path = quote(parts.path or "/", safe=Crawler.URL_SAFE_CHARACTERS)
+            if parts.query:
+                path += "?" + quote(parts.query, safe=Crawler.URL_SAFE_CHARACTERS)
+            writer.write((
+                "GET " + path + " HTTP/1.0\r\nHost: " + parts.netloc + "\r\nUser-Agent: "
+                + Crawler.USER_AGENT + "\r\nAccept: text/html\r\nConnection: close\r\n\r\n"
+            ).encode("ascii"))
+            await writer.drain()
+            response = await asyncio.wait_for(self._read(reader), Crawler.TIMEOUT)
+        finally:
+            writer.close()
+
+        head, _, body = response.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("iso-8859-1").split("\r\n")
+        status_parts = status_line.split()
+        if len(status_parts) < 2 or not status_parts[1].isdigit():
+            raise ValueError("Malformed status line " + repr(status_line) + " of " + url)
+        headers = {
+            name.strip().lower(): value.strip()
+            for name, _, value in (line.partition(":") for line in header_lines)
+        }
+        return int(status_parts[1]), headers, body
+
+
+    async def _read(self, reader: asyncio.StreamReader) -> bytes:
+        """Reads until connection is closed, response is truncated to MAX_PAGE_BYTES"""
+        blocks: List[bytes] = []
+        size = 0
+        while size < Crawler.MAX_PAGE_BYTES:
+            block = await reader.read(Crawler.MAX_PAGE_BYTES - size)
+            if block == b"":
+                break
+            blocks.append(block)
+            size += len(block)
+        return b"".join(blocks)
+
+
+    async def _wait_for_turn(self, origin: str) -> None:
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.rate
+        robots = self._robots.get(origin)
+        if isinstance(robots, RobotFileParser):
+            interval = max(interval, float(robots.crawl_delay(Crawler.USER_AGENT) or 0))
+
+        async with self._get_host_lock(origin):
+            delay = self._next_request_times.get(origin, 0.0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request_times[origin] = loop.time() + interval
+
+
+    def _get_host_lock(self, key: str) -> asyncio.Lock:
+        return self._host_locks.setdefault(key, asyncio.Lock())
+
+
+    def _decode(self, headers: Dict[str, str], body: bytes) -> str:
+        """Charset is taken from Content-Type header or meta tag, utf-8 by default"""
+        content_type = headers.get("content-type", "").encode("ascii", errors="ignore")
+        match = Crawler.CHARSET_PATTERN.search(content_type)
+        if match is None:
+            match = Crawler.CHARSET_PATTERN.search(body[:4096])
+        charset = match.group(1).decode("ascii") if match is not None else "utf-8"
+        try:
+            return body.decode(charset, errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
@@ -0,0 +1,32 @@
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+
+class PageParser(HTMLParser):
+    """Collects title and targets of links of HTML page, links are left relative"""
+
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.links: List[str] = []
+        self._is_in_title = False
+
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "title":
+            self._is_in_title = True
+        elif tag in ("a", "area", "frame", "iframe"):
+            for name, value in attrs:
+                if name in ("href", "src") and value:
+                    self.links.append(value.strip())
+
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._is_in_title = False
+
+
+    def handle_data(self, data: str) -> None:
+        if self._is_in_title:
+            self.title += data
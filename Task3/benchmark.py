@@ -0,0 +1,131 @@
+import json
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from main import (
+    JSON, OUTPUT_DIR, calculate_similarities_in_batch, create_directory, display_finish,
+    prepare_environment, prepare_filename
+)
+from module.PageIndex import PageIndex
+
+"""
+    How to run:
+        python benchmark.py -c 10 100 1000 10000
+        python benchmark.py -c 1000 10000 --pages 5000 --cluster_pages 20 -k 10
+"""
+
+# VAR ------------------------------------------------------------------------ #
+BENCHMARK: str = "benchmark"
+
+
+# MAIN ----------------------------------------------------------------------- #
+def main() -> None:
+    args = prepare_args()
+    create_directory(OUTPUT_DIR)
+    rng = np.random.default_rng(args.seed)
+
+    results: List[Dict[str, Any]] = []
+    for clusters_number in args.clusters:
+        print("Benchmarking " + str(clusters_number) + " clusters ...")
+        cluster_flags = generate_flags(rng, args.pages, clusters_number, args.cluster_pages)
+        users = generate_flags(rng, args.pages, args.users, args.user_pages).T
+        result = benchmark_top_clusters(cluster_flags, users, args.top_k)
+        print(
+            "brute force: " + str(round(result["brute_force_ms"], 3)) + " ms, inverted index: "
+            + str(round(result["inverted_index_ms"], 3)) + " ms per user, equal results: "
+            + str(result["are_results_equal"])
+        )
+        results.append(result)
+
+    filepath = OUTPUT_DIR + prepare_filename(BENCHMARK, JSON)
+    print("Saving results to " + filepath + " ...")
+    with open(filepath, "w") as file:
+        json.dump({"environment": prepare_environment(args), "results": results}, file, indent=2)
+
+    display_finish()
+
+
+# DEF ------------------------------------------------------------------------ #
+def generate_flags(rng: np.random.Generator, pages_number: int, columns_number: int,
+                   pages_per_column: int) -> np.ndarray:
+    """Every column has given number of pages, popularity of pages follows Zipf law"""
+    weights = 1 / np.arange(1, pages_number + 1)
+    flags = np.zeros((pages_number, columns_number), dtype=bool)
+    for column in range(columns_number):
+        flags[rng.choice(
+            pages_number, min(pages_per_column, pages_number), replace=False,
+            p=weights / weights.sum()
+        ), column] = True
+    return flags
+
+
+def benchmark_top_clusters(cluster_flags: np.ndarray, users: np.ndarray,
+                           k: int) -> Dict[str, Any]:
+    """
+    Brute force scores every cluster for all users in one batch, so clusters are converted
+    once, results of both paths are compared
+    """
+    start = time.perf_counter()
+    brute_force_clusters = []
+    for similarities in calculate_similarities_in_batch(cluster_flags, users):
+        best = np.lexsort((np.arange(len(similarities)), -similarities))[:k]
+        brute_force_clusters.append(best[similarities[best] > 0])
+    brute_force_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    page_index = PageIndex(cluster_flags)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_clusters = [page_index.get_top_clusters(user, k)[0] for user in users]
+    inverted_index_seconds = time.perf_counter() - start
+
+    return {
+        "clusters_number": cluster_flags.shape[1],
+        "pages_number": cluster_flags.shape[0],
+        "users_number": len(users),
+        "brute_force_ms": brute_force_seconds / len(users) * 1000,
+        "inverted_index_ms": inverted_index_seconds / len(users) * 1000,
+        "index_building_ms": index_seconds * 1000,
+        "are_results_equal": all(
+            np.array_equal(first, second)
+            for first, second in zip(brute_force_clusters, index_clusters)
+        )
+    }
+
+
+def prepare_args() -> Namespace:
+    arg_parser = ArgumentParser()
+
+    arg_parser.add_argument(
+        "-c", "--clusters", type=int, nargs="+", required=True,
+        help="Numbers of generated clusters to benchmark"
+    )
+    arg_parser.add_argument(
+        "-k", "--top_k", type=int, default=5, help="Number of returned clusters"
+    )
+    arg_parser.add_argument(
+        "--pages", type=int, default=2000, help="Number of pages"
+    )
+    arg_parser.add_argument(
+        "--cluster_pages", type=int, default=10, help="Number of pages in cluster"
+    )
+    arg_parser.add_argument(
+        "--users", type=int, default=200, help="Number of generated users"
+    )
+    arg_parser.add_argument(
+        "--user_pages", type=int, default=5, help="Number of pages visited by user"
+    )
+    arg_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of random generator"
+    )
+
+    return arg_parser.parse_args()
+
+
+# __MAIN__ ------------------------------------------------------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import json
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from main import (
+    JSON, OUTPUT_DIR, create_directory, display_finish, load_clusters_and_pages, load_users,
+    prepare_environment, prepare_filename, rank_pages
+)
+
+"""
+    How to run:
+        python evaluate.py -f data/clusters4.csv data/clusters7.csv data/clusters10.csv \\
+            -u data/extracted_user_pages-091350.arff
+        python evaluate.py -f data/clusters7.csv -u data/extracted_user_pages-091350.arff \\
+            -k 1 3 5 --hidden 0.5 --batch_size 256
+"""
+
+# VAR ------------------------------------------------------------------------ #
+EVALUATION: str = "evaluation"
+MIN_VISITED_PAGES: int = 2
+
+
+# MAIN ----------------------------------------------------------------------- #
+def main() -> None:
+    args = prepare_args()
+    create_directory(OUTPUT_DIR)
+
+    results: List[Dict[str, Any]] = []
+    for filepath in args.filepaths:
+        print("Evaluating " + filepath + " ...")
+        clusters, pages = load_clusters_and_pages(filepath)
+        users = load_users(args.users, pages)
+        users = users[users.sum(axis=1) >= MIN_VISITED_PAGES]
+        visible, hidden = hide_pages(np.random.default_rng(args.seed), users, args.hidden)
+
+        result = evaluate(
+            clusters.to_numpy(dtype=bool), visible, hidden, args.top_k, args.batch_size
+        )
+        result["filepath"] = filepath
+        display_result(result)
+        results.append(result)
+
+    filepath = OUTPUT_DIR + prepare_filename(EVALUATION, JSON)
+    print("Saving results to " + filepath + " ...")
+    with open(filepath, "w") as file:
+        json.dump({"environment": prepare_environment(args), "results": results}, file, indent=2)
+
+    display_finish()
+
+
+# DEF ------------------------------------------------------------------------ #
+def hide_pages(rng: np.random.Generator, users: np.ndarray,
+               hidden_part: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Given part of visited pages of every user, at least one and not all of them,
+    is hidden at random. Returns visible and hidden pages.
+    """
+    visited_numbers = users.sum(axis=1)
+    hidden_numbers = np.clip(
+        np.floor(visited_numbers * hidden_part).astype(np.int64), 1, visited_numbers - 1
+    )
+    keys = np.where(users, rng.random(users.shape), np.inf)
+    ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+    hidden = users & (ranks < hidden_numbers[:, np.newaxis])
+    return users & ~hidden, hidden
+
+
+def evaluate(cluster_flags: np.ndarray, visible: np.ndarray, hidden: np.ndarray,
+             top_k: List[int], batch_size: int) -> Dict[str, Any]:
+    """
+    Users are scored in batches, hit is hidden page among k best recommended pages.
+    Precision is divided by k and recall by number of hidden pages.
+    """
+    max_k = max(top_k)
+    hits = np.zeros((len(visible), max_k), dtype=bool)
+    latencies: List[float] = []
+    for start in range(0, len(visible), batch_size):
+        end = start + batch_size
+        batch_start = time.perf_counter()
+        _, _, orders, counts = rank_pages(cluster_flags, visible[start:end])
+        latencies.append(time.perf_counter() - batch_start)
+
+        top_pages = orders[:, :max_k]
+        is_recommended = np.arange(top_pages.shape[1]) < counts[:, np.newaxis]
+        hits[start:end, :top_pages.shape[1]] = is_recommended & np.take_along_axis(
+            hidden[start:end], top_pages, axis=1
+        )
+
+    hits_numbers = np.cumsum(hits, axis=1)
+    hidden_numbers = hidden.sum(axis=1)
+    seconds = sum(latencies)
+    p50, p90, p99 = (np.percentile(latencies, [50, 90, 99]) * 1000).tolist()
+    return {
+        "users_number": len(visible),
+        "clusters_number": cluster_flags.shape[1],
+        "precision": {
+            str(k): float((hits_numbers[:, k - 1] / k).mean()) for k in top_k
+        },
+        "recall": {
+            str(k): float((hits_numbers[:, k - 1] / hidden_numbers).mean()) for k in top_k
+        },
+        "users_per_second": len(visible) / seconds if seconds > 0 else None,
+        "batch_size": batch_size,
+        "batch_latency_ms": {"p50": p50, "p90": p90, "p99": p99}
+    }
+
+
+def display_result(result: Dict[str, Any]) -> None:
+    for k in result["precision"]:
+        print(
+            "k = " + k + ": precision " + str(round(result["precision"][k], 4))
+            + ", recall " + str(round(result["recall"][k], 4))
+        )
+    print(
+        str(round(result["users_per_second"] or 0)) + " users/s, batch latency p50 "
+        + str(round(result["batch_latency_ms"]["p50"], 3)) + " ms, p99 "
+        + str(round(result["batch_latency_ms"]["p99"], 3)) + " ms"
+    )
+
+
+def prepare_args() -> Namespace:
+    arg_parser = ArgumentParser()
+
+    arg_parser.add_argument(
+        "-f", "--filepaths", type=str, nargs="+", required=True, help="Clusters filepaths"
+    )
+    arg_parser.add_argument(
+        "-u", "--users", type=str, required=True, help="Arff filepath of users visited pages"
+    )
+    arg_parser.add_argument(
+        "-k", "--top_k", type=int, nargs="+", default=[1, 3, 5],
+        help="Numbers of recommended pages to evaluate"
+    )
+    arg_parser.add_argument(
+        "--hidden", type=float, default=0.3, help="Part of visited pages hidden from user"
+    )
+    arg_parser.add_argument(
+        "--batch_size", type=int, default=1024, help="Number of users scored together"
+    )
+    arg_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of random generator"
+    )
+
+    return arg_parser.parse_args()
+
+
+# __MAIN__ ------------------------------------------------------------------- #
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,46 @@
+import os
+import platform
 import random
 import subprocess
 import sys
+import time
 from argparse import ArgumentParser, Namespace
-from typing import List, Tuple
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import jaccard_score
+
+from module.BooleanArffReader import BooleanArffReader
+from module.KModes import KModes
+from module.PageIndex import PageIndex
+from module.RecommendationServer import RecommendationServer
 
 """
     How to run:
         python main.py -f data/clusters4.csv
         python main.py -f data/clusters4.csv -ru
+        python main.py -f data/clusters10.csv -k 3
+        python main.py -f data/clusters12.csv --cluster 12 \\
+            -u data/extracted_user_pages-091350.arff
+        python main.py -f data/clusters4.csv -u data/extracted_user_pages-091350.arff
+        python main.py -f data/clusters4.csv --serve --port 8080
+            curl -d '{"pages": ["/", "/ksc.html"]}' localhost:8080/recommend
+            curl localhost:8080/metrics
 
 """
 
 # VAR ------------------------------------------------------------------------ #
 OUTPUT_DIR: str = "output/"
+RECOMMENDATIONS: str = "recommendations"
+CSV: str = ".csv"
+JSON: str = ".json"
+USERS_BATCH_SIZE: int = 16384
+HOST: str = "127.0.0.1"
+FULL_DATA_MIN_FREQUENCY: float = 0.5
+PAGE_COLUMN_WIDTH: int = 50
+FLAG_COLUMN_WIDTH: int = 11
 
 CONSTANT_USER: List[bool] = [
     False, False, False, False, False, False, True, False, True, True, False, False, True, True,
@@ -31,9 +55,29 @@ def main() -> None:
     filepath = args.filepath
     is_random_user = args.random_user
 
+    if args.cluster is not None and args.users is None:
+        print("Users arff must be given with -u in order to cluster them !!!")
+        return
+
+    if args.cluster is not None:
+        cluster_users(args.users, filepath, KModes(
+            args.cluster, args.mini_batch, args.iterations, args.restarts, args.workers
+        ))
+        display_finish()
+        return
+
     print("Loading data ...")
     clusters, pages = load_clusters_and_pages(filepath)
 
+    if args.users is not None:
+        recommend_pages_in_batch(clusters, pages, args.users)
+        display_finish()
+        return
+
+    if args.serve:
+        serve_recommendations(clusters, pages, args.port, args.batch_size, args.batch_wait_ms)
+        return
+
     if len(CONSTANT_USER) != len(pages) and not is_random_user:
         print("Number of pages and visited pages by user must be equal, "
               "otherwise program cannot work !!!")
@@ -43,10 +87,16 @@ def main() -> None:
     user: List[bool] = get_user(is_random_user, len(pages))
 
     print("Calculating similarities ...")
-    (
-        similarities, most_similar_cluster_index,
-        most_similar_cluster_coefficient_value
-    ) = calculate_similarities(clusters, user)
+    if args.top_k is not None:
+        (
+            similarities, most_similar_cluster_index,
+            most_similar_cluster_coefficient_value
+        ) = calculate_top_similarities(PageIndex(clusters.to_numpy(dtype=bool)), user, args.top_k)
+    else:
+        (
+            similarities, most_similar_cluster_index,
+            most_similar_cluster_coefficient_value
+        ) = calculate_similarities(clusters, user)
 
     print("\nCalculated similarities:")
     for similarity in similarities:
@@ -72,7 +122,7 @@ def main() -> None:
 
 # DEF ------------------------------------------------------------------------ #
 def load_clusters_and_pages(filepath: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    df = pd.read_csv(filepath, header=None, delim_whitespace=True)
+    df = pd.read_csv(filepath, header=None, sep=r"\s+")
     clusters = df.iloc[:, 2:]
     pages = df.iloc[:, 0]
     return clusters, pages
@@ -85,11 +135,146 @@ def get_user(is_random_user: bool, random_user_pages_number: int) -> List[bool]:
     return CONSTANT_USER
 
 
+def recommend_pages_in_batch(clusters: pd.DataFrame, pages: pd.DataFrame,
+                             users_filepath: str) -> None:
+    print("Loading users ...")
+    users = load_users(users_filepath, pages)
+    cluster_flags = clusters.to_numpy(dtype=bool)
+
+    print("Calculating similarities of " + str(len(users)) + " users ...")
+    start = time.perf_counter()
+    best_clusters = np.empty(len(users), dtype=np.int64)
+    best_similarities = np.empty(len(users))
+    for begin in range(0, len(users), USERS_BATCH_SIZE):
+        similarities = calculate_similarities_in_batch(
+            cluster_flags, users[begin:begin + USERS_BATCH_SIZE]
+        )
+        best_clusters[begin:begin + USERS_BATCH_SIZE] = np.argmax(similarities, axis=1)
+        best_similarities[begin:begin + USERS_BATCH_SIZE] = similarities.max(axis=1)
+    print("Calculated in " + str(round(time.perf_counter() - start, 3)) + " s")
+
+    # Pages of the most similar cluster which user has not visited
+    recommended = cluster_flags.T[best_clusters] & ~users
+    page_names = pages.to_numpy()
+    create_directory(OUTPUT_DIR)
+    filepath = OUTPUT_DIR + prepare_filename(RECOMMENDATIONS, CSV)
+    pd.DataFrame({
+        "cluster": best_clusters,
+        "similarity": best_similarities,
+        "recommended_pages": [" ".join(page_names[flags]) for flags in recommended]
+    }).to_csv(filepath, index_label="user")
+    print("Recommendations saved to " + filepath)
+
+
+def serve_recommendations(clusters: pd.DataFrame, pages: pd.DataFrame, port: int,
+                          batch_size: int, batch_wait_ms: float) -> None:
+    page_names = pages.tolist()
+    server = RecommendationServer(
+        (HOST, port), page_names,
+        partial(rank_recommended_pages, clusters.to_numpy(dtype=bool), np.array(page_names)),
+        batch_size, batch_wait_ms / 1000
+    )
+    print("Serving recommendations on http://" + HOST + ":" + str(port) + " ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(server.get_metrics())
+    finally:
+        server.server_close()
+
+
+def rank_recommended_pages(cluster_flags: np.ndarray, page_names: np.ndarray,
+                           users: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+    best_clusters, best_similarities, orders, counts = rank_pages(cluster_flags, users)
+    return best_clusters, best_similarities, [
+        page_names[order[:count]].tolist() for order, count in zip(orders, counts.tolist())
+    ]
+
+
+def rank_pages(cluster_flags: np.ndarray,
+               users: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Recommended pages are unvisited pages of the most similar cluster, ranked by sum of
+    similarities of clusters containing them. Returns the most similar clusters, their
+    similarities, users x pages indexes of pages in order of rank and numbers of
+    recommended pages, which are first in that order.
+    """
+    similarities = calculate_similarities_in_batch(cluster_flags, users)
+    best_clusters = np.argmax(similarities, axis=1)
+    recommended = cluster_flags.T[best_clusters] & ~users
+    scores = np.where(recommended, similarities @ cluster_flags.T, -1.0)
+    orders = np.argsort(-scores, axis=1, kind="stable")
+    return best_clusters, similarities.max(axis=1), orders, recommended.sum(axis=1)
+
+
+def cluster_users(users_filepath: str, filepath: str, k_modes: KModes) -> None:
+    """Users without visited pages are skipped, they are equally far from every cluster"""
+    print("Loading users ...")
+    page_names, packed, pages_number = BooleanArffReader(users_filepath).read()
+    packed = packed[packed.any(axis=1)]
+
+    print("Clustering " + str(len(packed)) + " users ...")
+    start = time.perf_counter()
+    modes, labels, cost = k_modes.fit_packed(packed, pages_number)
+    print(
+        "Clustered in " + str(round(time.perf_counter() - start, 3)) + " s, mean distance: "
+        + str(round(cost / max(len(packed), 1), 4)) + ", cluster sizes: "
+        + str(np.bincount(labels, minlength=len(modes)).tolist())
+    )
+
+    full_data = np.unpackbits(
+        packed, axis=1, count=pages_number
+    ).mean(axis=0) >= FULL_DATA_MIN_FREQUENCY
+    save_clusters(filepath, page_names, np.column_stack([full_data, modes.T]))
+    print("Clusters saved to " + filepath)
+
+
+def save_clusters(filepath: str, page_names: List[str], flags: np.ndarray) -> None:
+    """Whitespace format of clusters exported from Weka: page, full data and clusters flags"""
+    width = max([PAGE_COLUMN_WIDTH] + [len(name) + 1 for name in page_names])
+    with open(filepath, "w") as file:
+        for name, row in zip(page_names, flags.tolist()):
+            values = [str(flag).rjust(FLAG_COLUMN_WIDTH) for flag in row]
+            file.write(name.ljust(width - 1) + "".join(values) + "\n")
+
+
+def load_users(filepath: str, pages: pd.DataFrame) -> np.ndarray:
+    """Columns are ordered like pages of clusters and missing pages are not visited"""
+    attributes, users = load_users_and_pages(filepath)
+    columns = pd.Index(attributes).get_indexer(pages)
+    return np.where(columns >= 0, users[:, columns], False)
+
+
+def load_users_and_pages(filepath: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Returns attributes and users x attributes boolean matrix of dense or sparse arff
+    with nominal {True, False} attributes
+    """
+    attributes, packed, attributes_number = BooleanArffReader(filepath).read()
+    return attributes, np.unpackbits(packed, axis=1, count=attributes_number).astype(bool)
+
+
+def calculate_similarities_in_batch(cluster_flags: np.ndarray, users: np.ndarray) -> np.ndarray:
+    """
+    Returns users x clusters Jaccard similarities. Intersections are counted with one
+    matrix product, similarity of empty user and empty cluster is 0 like in sklearn.
+    """
+    intersections = (
+        users.astype(np.float32) @ cluster_flags.astype(np.float32)
+    ).astype(np.float64)
+    unions = (
+        users.sum(axis=1)[:, np.newaxis] + cluster_flags.sum(axis=0) - intersections
+    )
+    return np.divide(intersections, unions, out=np.zeros_like(intersections), where=unions > 0)
+
+
 def calculate_similarities(clusters: pd.DataFrame,
                            user: List[bool]) -> Tuple[List[List], int, float]:
+    user_similarities = calculate_similarities_in_batch(
+        clusters.to_numpy(dtype=bool), np.array([user], dtype=bool)
+    )[0]
     similarities: List[List] = [
-        [index, jaccard_score(user, clusters[name].to_numpy())]
-        for index, name in enumerate(clusters.columns)
+        [index, similarity] for index, similarity in enumerate(user_similarities.tolist())
     ]
 
     most_similar_cluster_index = np.argmax(similarities, axis=0)[1]
@@ -98,6 +283,19 @@ def calculate_similarities(clusters: pd.DataFrame,
     return similarities, most_similar_cluster_index, most_similar_cluster_coefficient_value
 
 
+def calculate_top_similarities(page_index: PageIndex, user: List[bool],
+                               k: int) -> Tuple[List[List], int, float]:
+    """Like calculate_similarities, but only k most similar clusters are returned"""
+    clusters, values = page_index.get_top_clusters(np.array(user, dtype=bool), k)
+    similarities: List[List] = [
+        [index, similarity] for index, similarity in zip(clusters.tolist(), values.tolist())
+    ]
+    # Without common pages all similarities are 0 and the first cluster is chosen
+    if len(similarities) == 0:
+        return similarities, 0, 0.0
+    return similarities, similarities[0][0], similarities[0][1]
+
+
 def get_recommended_pages(clusters: pd.DataFrame, pages: pd.DataFrame,
                           user: List[bool], most_similar_cluster_index: int) -> List[str]:
     most_similar_flags = clusters[clusters.columns[most_similar_cluster_index]].to_numpy()
@@ -107,15 +305,74 @@ def get_recommended_pages(clusters: pd.DataFrame, pages: pd.DataFrame,
     ]
 
 
+def prepare_filename(name: str, extension: str, add_date: bool = True) -> str:
+    return (name + ("-" + datetime.now().strftime("%H%M%S") if add_date else "")
+            + extension).replace(" ", "")
+
+
+def create_directory(path: str) -> None:
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+def prepare_environment(args: Namespace) -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "arguments": vars(args)
+    }
+
+
 def prepare_args() -> Namespace:
     arg_parser = ArgumentParser()
 
     arg_parser.add_argument(
-        "-f", "--filepath", required=True, type=str, help="Clusters filepath"
+        "-f", "--filepath", required=True, type=str,
+        help="Clusters filepath, output filepath when clustering"
     )
     arg_parser.add_argument(
         "-ru", "--random_user", default=False, action="store_true", help="Generate random user"
     )
+    arg_parser.add_argument(
+        "-k", "--top_k", type=int,
+        help="Use inverted page index and show only k most similar clusters"
+    )
+    arg_parser.add_argument(
+        "-u", "--users", type=str,
+        help="Arff filepath of users visited pages, pages are recommended for every user"
+    )
+    arg_parser.add_argument(
+        "--cluster", type=int,
+        help="Cluster users of arff given in -u into given number of clusters with k-modes "
+             "and save them to -f filepath"
+    )
+    arg_parser.add_argument(
+        "--mini_batch", type=int, default=1024, help="Number of users in k-modes mini-batch"
+    )
+    arg_parser.add_argument(
+        "--iterations", type=int, default=100, help="Number of k-modes mini-batches"
+    )
+    arg_parser.add_argument(
+        "--restarts", type=int, default=4, help="Number of k-modes runs with different seeds"
+    )
+    arg_parser.add_argument(
+        "-w", "--workers", type=int, help="Number of processes of restarts, all cores by default"
+    )
+    arg_parser.add_argument(
+        "--serve", default=False, action="store_true",
+        help="Serve recommendations over HTTP, clusters are loaded once"
+    )
+    arg_parser.add_argument(
+        "--port", type=int, default=8080, help="Port of server"
+    )
+    arg_parser.add_argument(
+        "--batch_size", type=int, default=256, help="Maximum number of requests scored together"
+    )
+    arg_parser.add_argument(
+        "--batch_wait_ms", type=float, default=2.0,
+        help="Maximum time in ms to wait for batch to fill"
+    )
 
     return arg_parser.parse_args()
 
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+
+class BooleanArffReader:
+    """
+    Reads dense or sparse arff with nominal {True, False} attributes straight into
+    users x attributes matrix packed with numpy.packbits. Missing values (?) are False,
+    values omitted in sparse rows are the first declared nominal value of attribute.
+    Packed matrix is cached beside arff in .npy file, which is reopened memory mapped
+    while modification time and size (or content hash, when only time changed) match.
+    """
+    BITS = ".bits.npy"
+    META = ".bits.json"
+    VERSION = 2
+    DATA = b"@data"
+    ATTRIBUTE = b"@attribute"
+    TRUE = ord("T")
+    LINES_CHUNK_SIZE = 65536
+    HASH_BLOCK_SIZE = 1024 * 1024
+    IGNORED_CHARACTERS = b" \t\r'\""
+
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self.bits_path = filepath + BooleanArffReader.BITS
+        self.meta_path = filepath + BooleanArffReader.META
+
+
+    def read(self) -> Tuple[List[str], np.ndarray, int]:
+        """Returns attributes, packed matrix and number of attributes"""
+        stat = os.stat(self.filepath)
+        meta = self._load_meta()
+        if (meta is not None and meta.get("version") == BooleanArffReader.VERSION
+                and os.path.exists(self.bits_path) and meta["size"] == stat.st_size):
+            if meta["mtime_ns"] != stat.st_mtime_ns and meta["sha256"] == self._hash_file():
+                meta["mtime_ns"] = stat.st_mtime_ns
+                self._save_meta(meta)
+            if meta["mtime_ns"] == stat.st_mtime_ns:
+                return meta["attributes"], self._open_bits(), len(meta["attributes"])
+
+        attributes, packed = self._parse()
+        np.save(self.bits_path, packed)
+        self._save_meta({
+            "version": BooleanArffReader.VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": self._hash_file(),
+            "attributes": attributes
+        })
+        return attributes, self._open_bits(), len(attributes)
+
+
+    def _parse(self) -> Tuple[List[str], np.ndarray]:
+        attributes: List[str] = []
+        first_values: List[bool] = []
+        chunks: List[np.ndarray] = []
+        with open(self.filepath, "rb") as file:
+            for line in file:
+                if line.lower().startswith(BooleanArffReader.ATTRIBUTE):
+                    attributes.append(line.split()[1].decode("utf-8"))
+                    first_value = line.partition(b"{")[2].partition(b"}")[0].split(b",")[0]
+                    first_values.append(self._is_true(first_value))
+                elif line.lower().startswith(BooleanArffReader.DATA):
+                    break
+
+            lines: List[bytes] = []
+            for line in file:
+                line = line.strip()
+                if line != b"" and not line.startswith(b"%"):
+                    lines.append(line)
+                if len(lines) == BooleanArffReader.LINES_CHUNK_SIZE:
+                    chunks.append(self._parse_lines(lines, np.array(first_values, dtype=bool)))
+                    lines = []
+            chunks.append(self._parse_lines(lines, np.array(first_values, dtype=bool)))
+
+        return attributes, np.concatenate(chunks)
+
+
+    def _parse_lines(self, lines: List[bytes], first_values: np.ndarray) -> np.ndarray:
+        """
+        Dense lines are joined and only first character of every value is checked,
+        sparse lines are parsed one by one starting from first nominal values
+        """
+        attributes_number = len(first_values)
+        is_sparse = np.array([line.startswith(b"{") for line in lines], dtype=bool)
+        flags = np.zeros((len(lines), attributes_number), dtype=bool)
+        flags[is_sparse] = first_values
+
+        dense_lines = [
+            line.translate(None, BooleanArffReader.IGNORED_CHARACTERS)
+            for line, sparse in zip(lines, is_sparse) if not sparse
+        ]
+        if len(dense_lines) > 0:
+            characters = np.frombuffer(b",".join(dense_lines), dtype=np.uint8)
+            starts = np.r_[0, np.flatnonzero(characters == ord(",")) + 1]
+            if len(starts) != len(dense_lines) * attributes_number:
+                raise ValueError("Dense rows of " + self.filepath + " have wrong number of values")
+            flags[~is_sparse] = (characters[starts] == BooleanArffReader.TRUE).reshape(
+                len(dense_lines), attributes_number
+            )
+
+        for row in np.flatnonzero(is_sparse).tolist():
+            for item in lines[row][1:-1].split(b","):
+                if item.strip() != b"":
+                    index, value = item.split()
+                    flags[row, int(index)] = self._is_true(value)
+
+        return np.packbits(flags, axis=1)
+
+
+    def _is_true(self, value: bytes) -> bool:
+        return value.strip().strip(b"'\"").startswith(b"T")
+
+
+    def _open_bits(self) -> np.ndarray:
+        return np.load(self.bits_path, mmap_mode="r")
+
+
+    def _load_meta(self):
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path) as file:
+            return json.load(file)
+
+
+    def _save_meta(self, meta) -> None:
+        with open(self.meta_path, "w") as file:
+            json.dump(meta, file)
+
+
+    def _hash_file(self) -> str:
+        file_hash = hashlib.sha256()
+        with open(self.filepath, "rb") as file:
+            for block in iter(lambda: file.read(BooleanArffReader.HASH_BLOCK_SIZE), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
@@ -0,0 +1,124 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class KModes:
+    """
+    Mini-batch k-modes with Jaccard distance for boolean users x pages matrix. Users and
+    modes are packed to bits, so intersections are counted with bitwise and and popcount.
+    Mode of cluster has pages visited by at least half of its users (at least the most
+    visited page), frequencies of pages are accumulated over mini-batches. Restarts with
+    different seeds are run in parallel and the one with the lowest cost is kept.
+    """
+    POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    SAMPLE_SIZE = 10000
+
+
+    def __init__(self, clusters_number: int, batch_size: int = 1024, iterations: int = 100,
+                 restarts: int = 4, workers: Optional[int] = None, seed: int = 0) -> None:
+        self.clusters_number = clusters_number
+        self.batch_size = batch_size
+        self.iterations = iterations
+        self.restarts = restarts
+        self.workers = workers
+        self.seed = seed
+
+
+    def fit(self, users: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Returns clusters x pages modes, cluster of every user and sum of distances"""
+        return self.fit_packed(np.packbits(users, axis=1), users.shape[1])
+
+
+    def fit_packed(self, packed: np.ndarray,
+                   pages_number: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Like fit, but users are already packed to bits along pages"""
+        packed = np.ascontiguousarray(packed)
+        seeds = [self.seed + restart for restart in range(self.restarts)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(
+                self._fit_once, [packed] * len(seeds), [pages_number] * len(seeds), seeds
+            ))
+        return min(results, key=lambda result: result[2])
+
+
+    def _fit_once(self, packed: np.ndarray, pages_number: int,
+                  seed: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        rng = np.random.default_rng(seed)
+        sizes = self._count_bits(packed)
+        modes = self._initialize_modes(rng, packed, sizes)
+        frequencies = np.zeros((self.clusters_number, pages_number))
+        members = np.zeros(self.clusters_number)
+
+        for _ in range(self.iterations):
+            batch = rng.choice(len(packed), min(self.batch_size, len(packed)), replace=False)
+            labels, _ = self._assign(packed[batch], sizes[batch], modes)
+            flags = np.unpackbits(packed[batch], axis=1, count=pages_number)
+            np.add.at(frequencies, labels, flags)
+            members += np.bincount(labels, minlength=self.clusters_number)
+            modes = self._prepare_modes(frequencies, members, modes)
+
+        # Final assignment of all users and modes prepared from it, like in full k-modes
+        labels, _ = self._assign_in_batches(packed, sizes, modes)
+        frequencies = np.zeros((self.clusters_number, pages_number))
+        np.add.at(frequencies, labels, np.unpackbits(packed, axis=1, count=pages_number))
+        modes = self._prepare_modes(
+            frequencies, np.bincount(labels, minlength=self.clusters_number), modes
+        )
+        labels, distances = self._assign_in_batches(packed, sizes, modes)
+        return (
+            np.unpackbits(modes, axis=1, count=pages_number).astype(bool), labels,
+            float(distances.sum())
+        )
+
+
+    def _initialize_modes(self, rng: np.random.Generator, packed: np.ndarray,
+                          sizes: np.ndarray) -> np.ndarray:
+        """k-means++ seeding on sample of users, next mode is drawn proportionally to distance"""
+        sample = rng.choice(len(packed), min(KModes.SAMPLE_SIZE, len(packed)), replace=False)
+        modes = packed[sample[[rng.integers(len(sample))]]]
+        for _ in range(1, self.clusters_number):
+            _, distances = self._assign(packed[sample], sizes[sample], modes)
+            total = distances.sum()
+            probabilities = distances / total if total > 0 else None
+            modes = np.vstack([modes, packed[sample[rng.choice(len(sample), p=probabilities)]]])
+        return modes
+
+
+    def _prepare_modes(self, frequencies: np.ndarray, members: np.ndarray,
+                       modes: np.ndarray) -> np.ndarray:
+        """Clusters without members keep previous modes"""
+        flags = frequencies * 2 >= np.maximum(members, 1)[:, np.newaxis]
+        flags[np.arange(len(flags)), frequencies.argmax(axis=1)] = True
+        return np.where((members > 0)[:, np.newaxis], np.packbits(flags, axis=1), modes)
+
+
+    def _assign_in_batches(self, packed: np.ndarray, sizes: np.ndarray,
+                           modes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        labels = np.empty(len(packed), dtype=np.int64)
+        distances = np.empty(len(packed))
+        for start in range(0, len(packed), self.batch_size):
+            end = start + self.batch_size
+            labels[start:end], distances[start:end] = self._assign(
+                packed[start:end], sizes[start:end], modes
+            )
+        return labels, distances
+
+
+    def _assign(self, packed: np.ndarray, sizes: np.ndarray,
+                modes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the nearest mode of every user and Jaccard distance to it"""
+        intersections = KModes.POPCOUNT[
+            packed[:, np.newaxis, :] & modes[np.newaxis, :, :]
+        ].sum(axis=2, dtype=np.int64)
+        unions = sizes[:, np.newaxis] + self._count_bits(modes) - intersections
+        distances = 1 - np.divide(
+            intersections, unions, out=np.zeros(intersections.shape), where=unions > 0
+        )
+        labels = distances.argmin(axis=1)
+        return labels, distances[np.arange(len(labels)), labels]
+
+
+    def _count_bits(self, packed: np.ndarray) -> np.ndarray:
+        return KModes.POPCOUNT[packed].sum(axis=1, dtype=np.int64)
@@ -0,0 +1,40 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class PageIndex:
+    """
+    Inverted index from page to clusters containing it, kept as CSR posting lists.
+    Only clusters sharing at least one page with user are scored, intersections are
+    counted from posting lists of visited pages and Jaccard similarity is exact.
+    """
+
+
+    def __init__(self, cluster_flags: np.ndarray) -> None:
+        pages, clusters = np.nonzero(cluster_flags)
+        self.clusters_number = cluster_flags.shape[1]
+        self.postings = clusters.astype(np.int64)
+        self.indptr = np.searchsorted(pages, np.arange(cluster_flags.shape[0] + 1))
+        self.cluster_sizes = np.bincount(clusters, minlength=self.clusters_number)
+
+
+    def get_top_clusters(self, user: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns at most k clusters with the highest similarity and their similarities,
+        ordered by similarity and then index. Clusters without common pages are skipped.
+        """
+        visited = np.flatnonzero(user)
+        starts = self.indptr[visited]
+        lengths = self.indptr[visited + 1] - starts
+        # Positions of all postings of visited pages without loop over pages
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+        clusters, intersections = np.unique(self.postings[positions], return_counts=True)
+
+        similarities = intersections / (
+            len(visited) + self.cluster_sizes[clusters] - intersections
+        )
+        order = np.lexsort((clusters, -similarities))[:k]
+        return clusters[order], similarities[order]
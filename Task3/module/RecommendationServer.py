@@ -0,0 +1,147 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+
+Recommend = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray, List[List[str]]]]
+
+
+class RecommendationServer(ThreadingHTTPServer):
+    """
+    HTTP server answering POST /recommend with {"pages": [visited pages]} by
+    {"cluster", "similarity", "pages": [recommended pages]}, GET /metrics returns
+    latency percentiles. Requests from handler threads are collected by one thread into
+    batches of at most batch_size, waiting at most batch_wait seconds for the batch to fill,
+    and every batch is scored with one call of recommend(users x pages matrix).
+    """
+    LATENCIES_NUMBER = 10000
+    daemon_threads = True
+    request_queue_size = 128
+
+
+    def __init__(self, address: Tuple[str, int], page_names: List[str], recommend: Recommend,
+                 batch_size: int = 256, batch_wait: float = 0.002) -> None:
+        super().__init__(address, RecommendationHandler)
+        self.page_indexes = {name: index for index, name in enumerate(page_names)}
+        self.recommend = recommend
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.requests: queue.Queue = queue.Queue()
+        self.latencies: Deque[float] = deque(maxlen=RecommendationServer.LATENCIES_NUMBER)
+        self.requests_number = 0
+        self.batches_number = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self._score_batches, daemon=True).start()
+
+
+    def submit(self, visited_pages: List[str]) -> Future:
+        user = np.zeros(len(self.page_indexes), dtype=bool)
+        indexes = [self.page_indexes[page] for page in visited_pages if page in self.page_indexes]
+        user[indexes] = True
+        future: Future = Future()
+        self.requests.put((user, future))
+        return future
+
+
+    def record_latency(self, seconds: float) -> None:
+        with self.lock:
+            self.latencies.append(seconds)
+            self.requests_number += 1
+
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            requests_number, batches_number = self.requests_number, self.batches_number
+
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if len(latencies) > 0 else (0, 0)
+        return {
+            "requests": requests_number,
+            "batches": batches_number,
+            "mean_batch_size": requests_number / batches_number if batches_number > 0 else 0,
+            "p50_ms": p50,
+            "p99_ms": p99
+        }
+
+
+    def _score_batches(self) -> None:
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.requests.get(timeout=max(deadline - time.perf_counter(), 0)))
+                except queue.Empty:
+                    break
+
+            try:
+                users = np.array([user for user, _ in batch])
+                clusters, similarities, pages = self.recommend(users)
+                for index, (_, future) in enumerate(batch):
+                    future.set_result({
+                        "cluster": int(clusters[index]),
+                        "similarity": float(similarities[index]),
+                        "pages": pages[index]
+                    })
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
+            with self.lock:
+                self.batches_number += 1
+
+
+class RecommendationHandler(BaseHTTPRequestHandler):
+    server: RecommendationServer
+
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/metrics":
+            self._send_json(200, self.server.get_metrics())
+        else:
+            self._send_json(404, {"error": "Unknown path " + self.path})
+
+
+    def do_POST(self) -> None:  # noqa: N802
+        start = time.perf_counter()
+        if self.path != "/recommend":
+            self._send_json(404, {"error": "Unknown path " + self.path})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            visited_pages = body["pages"]
+            if not isinstance(visited_pages, list) or not all(
+                    isinstance(page, str) for page in visited_pages
+            ):
+                raise ValueError("pages must be list of strings")
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": repr(error)})
+            return
+
+        try:
+            recommendation = self.server.submit(visited_pages).result()
+        except Exception as error:
+            self._send_json(500, {"error": repr(error)})
+            return
+
+        self._send_json(200, recommendation)
+        self.server.record_latency(time.perf_counter() - start)
+
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Requests are not logged, metrics are available under /metrics"""
+
+
+    def _send_json(self, status: int, content: Dict[str, Any]) -> None:
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -2,6 +2,8 @@ import glob
 from argparse import ArgumentParser, Namespace
 from datetime import datetime
 
+import numpy as np
+
 from module.AutoCoder import AutoCoder
 from module.ImagePostprocessor import ImagePostprocessor
 from module.ImagePreprocessor import ImagePreprocessor
@@ -62,16 +64,17 @@ def main() -> None:
         )
         compressed_images_array = auto_coder.compress_images()
 
+        image_postprocessor: ImagePostprocessor = ImagePostprocessor(
+            np.stack(compressed_images_array), pattern_width, IMAGE_WIDTH
+        )
+        image_postprocessor.convert_to_image()
+        image_postprocessor.save_images([
+            f"{results_path}{neurons}/compressed_{test_image_name.split('.', 1)[0]}"
+            for test_image_name in test_image_names
+        ])
+
         zipped_arrays = zip(test_images_array, compressed_images_array, test_image_names)
         for test_image, compressed_image, test_image_name in zipped_arrays:
-            image_postprocessor: ImagePostprocessor = ImagePostprocessor(
-                compressed_image, pattern_width, IMAGE_WIDTH
-            )
-            image_postprocessor.convert_to_image()
-            image_postprocessor.save_image(
-                f"{results_path}{neurons}/compressed_{test_image_name.split('.', 1)[0]}"
-            )
-
             statistics_calculator.calculate_stats(
                 test_image, compressed_image, neurons, test_image_name
             )
@@ -7,7 +7,7 @@ from tqdm import tqdm
 
 class AutoCoder:
 
-    def __init__(self, training_images_array: List[float], test_images_array: List[List[float]],
+    def __init__(self, training_images_array: np.ndarray, test_images_array: np.ndarray,
                  neurons: int, iterations: int, learning_rate: float) -> None:
         self.training_images_array = training_images_array
         self.test_images_array = test_images_array
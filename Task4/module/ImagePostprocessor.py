@@ -1,52 +1,49 @@
+from typing import List
+
 import numpy as np
 from PIL import Image
 
 
 class ImagePostprocessor:
+    """
+    Reassembles images from patterns, compressed_image_array holds patterns of one image
+    (patterns, pw*pw) or of batch of images (images, patterns, pw*pw)
+    """
     BMP = ".bmp"
     PNG = ".png"
 
 
     def __init__(self, compressed_image_array: np.ndarray,
                  pattern_width: int, image_width: int) -> None:
-        self.compressed_image_array = compressed_image_array
+        self.compressed_image_array = np.asarray(compressed_image_array)
         self.pattern_width = pattern_width
         self.image_width = image_width
-        self.compressed_image = None
+        self.compressed_images: np.ndarray = np.empty(0, dtype=np.uint8)
 
 
     def convert_to_image(self) -> None:
-        patterns_in_row = int(self.image_width / self.pattern_width)
-        image_reshaped = [
-            pattern.reshape(self.pattern_width, self.pattern_width)
-            for pattern in self.compressed_image_array
-        ]
-
-        rows_array = []
-        for i in range(patterns_in_row):
-            rows = []
-            for _ in range(self.pattern_width):
-                rows.append([])
-
-            for j in range(patterns_in_row):
-                for k in range(self.pattern_width):
-                    rows[k] += image_reshaped[i * patterns_in_row + j][k].tolist()
-
-            rows_array += rows
-
-        self.compressed_image = Image.fromarray(self._rescale_to_px(np.array(rows_array)))
+        """Patterns are placed row by row, result is images x width x width uint8 array"""
+        patterns = self.compressed_image_array.reshape(
+            -1, self.compressed_image_array.shape[-2], self.compressed_image_array.shape[-1]
+        )
+        patterns_in_row = self.image_width // self.pattern_width
+        images = patterns.reshape(
+            len(patterns), patterns_in_row, patterns_in_row, self.pattern_width, self.pattern_width
+        ).transpose(0, 1, 3, 2, 4).reshape(len(patterns), self.image_width, self.image_width)
+        self.compressed_images = self._rescale_to_px(images)
 
 
     def save_image(self, filepath: str) -> None:
-        self._convert_image_mode("L").save(filepath + ImagePostprocessor.BMP)
-        self._convert_image_mode("L").save(filepath + ImagePostprocessor.PNG)
+        self.save_images([filepath])
 
 
-    def _convert_image_mode(self, mode: str):
-        if self.compressed_image.mode != mode:
-            return self.compressed_image.convert(mode)
-        return self.compressed_image
+    def save_images(self, filepaths: List[str]) -> None:
+        for image, filepath in zip(self.compressed_images, filepaths):
+            compressed_image = Image.fromarray(image)
+            compressed_image.save(filepath + ImagePostprocessor.BMP)
+            compressed_image.save(filepath + ImagePostprocessor.PNG)
 
 
-    def _rescale_to_px(self, image_array: np.ndarray):
-        return (np.clip(image_array, -1, 1) + 1) * 255 / 2
+    def _rescale_to_px(self, image_array: np.ndarray) -> np.ndarray:
+        """Pixels are truncated from float32 like in conversion of float image to mode L"""
+        return ((np.clip(image_array, -1, 1) + 1) * 255 / 2).astype(np.float32).astype(np.uint8)
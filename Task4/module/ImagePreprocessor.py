@@ -15,56 +15,48 @@ class ImagePreprocessor:
         self.image_width = image_width
 
 
-    def preprocess_training_images(self) -> List[float]:
-        images_array: List[float] = []
-        for image_path in self.training_image_paths:
-            images_array += self._prepare_random_patterns(self._read_and_rescale(image_path))
+    def preprocess_training_images(self) -> np.ndarray:
+        return np.concatenate([
+            self._prepare_random_patterns(self._read_and_rescale(image_path))
+            for image_path in self.training_image_paths
+        ])
 
-        return images_array
 
+    def preprocess_test_images(self) -> np.ndarray:
+        return np.stack([
+            self._prepare_all_patterns(self._read_and_rescale(image_path))
+            for image_path in self.test_image_paths
+        ])
 
-    def preprocess_test_images(self) -> List[List[float]]:
-        images_array: List[List[float]] = []
-        for image_path in self.test_image_paths:
-            images_array.append(self._prepare_all_patterns(self._read_and_rescale(image_path)))
 
-        return images_array
-
-
-    def _prepare_random_patterns(self, image: List) -> List:
-        patterns = []
-        patterns_indexes = []
+    def _prepare_random_patterns(self, image: np.ndarray) -> np.ndarray:
+        """
+        Unique positions are drawn at once without replacement, patterns are taken from
+        view of all windows of image, so only drawn patterns are copied
+        """
         self._check_pattern_ratio()
-
-        while len(patterns) < self.patterns_number:
-            row_index = np.random.randint(0, self.image_width - self.pattern_width + 1)
-            col_index = np.random.randint(0, self.image_width - self.pattern_width + 1)
-
-            if [row_index, col_index] not in patterns_indexes:
-                patterns_indexes.append([row_index, col_index])
-                pattern = image[
-                          row_index: row_index + self.pattern_width,
-                          col_index: col_index + self.pattern_width
-                          ]
-                patterns.append(pattern.ravel())
-
-        return patterns
-
-
-    def _prepare_all_patterns(self, image: List) -> List:
-        patterns = []
+        positions_in_row = self.image_width - self.pattern_width + 1
+        if self.patterns_number > positions_in_row * positions_in_row:
+            raise Exception("Number of patterns cannot be bigger than number of positions!")
+
+        rows, cols = np.divmod(
+            np.random.choice(positions_in_row * positions_in_row, self.patterns_number,
+                             replace=False),
+            positions_in_row
+        )
+        windows = np.lib.stride_tricks.sliding_window_view(
+            image, (self.pattern_width, self.pattern_width)
+        )
+        return windows[rows, cols].reshape(self.patterns_number, -1)
+
+
+    def _prepare_all_patterns(self, image: np.ndarray) -> np.ndarray:
+        """Image is cut into patterns row by row, like reading image pattern by pattern"""
         self._check_pattern_ratio()
-
-        row = 0
-        while row < self.image_width:
-            col = 0
-            while col < self.image_width:
-                pattern = image[row: row + self.pattern_width, col: col + self.pattern_width]
-                patterns.append(pattern.ravel())
-                col += self.pattern_width
-            row += self.pattern_width
-
-        return patterns
+        patterns_in_row = self.image_width // self.pattern_width
+        return np.ascontiguousarray(image.reshape(
+            patterns_in_row, self.pattern_width, patterns_in_row, self.pattern_width
+        ).transpose(0, 2, 1, 3)).reshape(patterns_in_row * patterns_in_row, -1)
 
 
     def _check_pattern_ratio(self) -> None:
@@ -73,5 +65,5 @@ class ImagePreprocessor:
             raise Exception("Result of dividing image_width AND pattern_width should be an integer!")
 
 
-    def _read_and_rescale(self, image_path: str) -> List:
-        return np.asarray(Image.open(image_path)) / 255 * 2 - 1
+    def _read_and_rescale(self, image_path: str) -> np.ndarray:
+        return np.asarray(Image.open(image_path), dtype=np.float32) / 255 * 2 - 1